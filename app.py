@@ -8,406 +8,376 @@ How to run:
 1. Install dependencies: pip install Flask
 2. python portfolio_app.py
 3. Open http://127.0.0.1:5000
-
-You can edit the DATA dict to fill missing info (photo paths, links, email, project repo/demo links).
+4. Optional: python bench.py --help lists the micro-benchmarks
+In production: gunicorn -c gunicorn.conf.py app:app (warms caches before fork);
+the build step runs flask --app app prepare to save compiled templates and
+pre-rendered pages for a fast cold start
+
+Contact messages are stored in instance/outbox.sqlite3 and mailed in the
+background when SMTP_HOST (plus SMTP_PORT/SMTP_USER/SMTP_PASSWORD) is set.
+Page views are counted in memory and flushed to instance/analytics.sqlite3;
+GET /stats returns the totals (set ANALYTICS_TOKEN to require a Bearer token).
+
+Edit content.json to fill missing info (photo paths, links, email, project repo/demo links);
+running workers pick up changes within CONTENT_POLL_INTERVAL seconds, no restart needed.
+To host several portfolios, set TENANTS_DIR to a directory of <host>.json files.
 """
-from flask import Flask, render_template_string, send_file, request, redirect, url_for
+from flask import Flask, render_template, send_file, request, redirect, url_for, abort, stream_with_context
+from collections import OrderedDict
+from datetime import datetime, timezone
+import gzip
+import hashlib
 import io
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz artifacts are produced
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is only offered when installed
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:  # optional: the JSON API falls back to the json module
+    orjson = None
 
 app = Flask(__name__)
 
 # ---------------------------
-# Replace or fill TODO fields below
-# ---------------------------
-DATA = {
-    "name": "Maheswaren CHINNASAMY",
-    "title": "Software Developer — Aspiring Software Tester",
-    "location": "Mauritius",
-    "summary": (
-        "I'm Maheswaren, a software developer and aspiring software test engineer. "
-        "I work with AI, IoT, mobile development (Flutter), and automation. "
-        "I love building practical projects that solve real problems."
-    ),
-    # TODO: Update profile_image to the path of your profile photo in static/ or an external URL
-    "profile_image": "/static/images/image.png",
-    # Contact info - TODO: fill in your email, linkedin, github links
-    "email": "ychinnasamy48@gmail.com",
-    "linkedin": "https://www.linkedin.com/in/maheswaren-chinnasamy-2a5a5a296/",
-    "github": "https://github.com/YovenBlast",
-    # Quick skills
-    "skills": {
-        "languages": ["Python", "Java", "Dart (Flutter)", "JavaScript"],
-        "frameworks": ["Flask", "Flutter", "React (basic)", "Node.js"],
-        "tools": ["Git", "Firebase", "Postman", "Selenium", "JUnit"],
-    },
-    "experience": [
-        {
-            "role": "Software Tester Intern",
-            "company": "SD Worx Mauritius",
-            "date": "March 2024",
-            "details": "Worked on real-world testing tasks; learned teamwork, workflows, and testing tools.",
-            "technologies": ["C#", "Playwright", "Agile Methodologies"],
-            "position": "",
-            "tasks": []
-        },
-        {
-            "role": "Working at CIM",
-            "company": "CIM Finance Services Ltd",
-            "date": "Present",
-            "details": "I work in software testing and development, doing forms, AI integration, and automations.",
-            "technologies": ["C#", "WSO2", "CSS", "Python"],
-            "position": "Analyst Programmer",
-            "tasks": [
-                "Design and Implementation of forms",
-                "Automation of ESB system",
-                "Providing innovative solutions",
-                "Files transfer"
-            ]
-        }
-    ],
-    "education": [
-        {"degree": "BSc (Hons) Software Engineering", "school": "University of Technology, Mauritius", "date": "Expected Feb 2025"}
-    ],
-    "certifications": [
-        {
-            "name": "WSO2 API Manager Practitioner Certification - V4",
-            "issuer": "WSO2",
-            "date": "September 2025",
-            "credential_url": "https://certification.wso2.com/certificate/CID-05134719"
-        },
-        {
-            "name": "Rise In",
-            "issuer": "Rise In",
-            "date": "November - December 2024",
-            "credential_url": "https://www.risein.com/courses/transactions-and-bitcoin"
-        }
-    ],
-    "projects": [
-        {
-            "id": "smart_compost",
-            "name": "Smart Composting Bin",
-            "summary": "IoT smart compost bin using ESP8266, multiple sensors (temp, moisture, pH, gas) and Firebase real-time DB.",
-            "stack": ["ESP8266", "MQ4/MQ8", "Firebase", "Python (data processing)"],
-            "contribution": "Designed sensor system, integrated Firebase streaming and dashboard, defined composting phases.",
-            "image": "/static/projects/compostBin.png",
-            "repo": "https://github.com/YovenBlast/Smart_Composting_Bin",
-            "demo": "",
-            "video_url": "",  # TODO: Add GitHub video URL
-            "images_url": "https://github.com/YovenBlast/Smart_Composting_Bin_Images"  # TODO: Add GitHub images folder URL
-        },
-        {
-            "id": "smart_parking",
-            "name": "IoT-Based Smart Parking System",
-            "summary": "Ultrasonic sensors detect car presence in zones; data sent via ESP8266 to a cloud DB.",
-            "stack": ["ESP8266", "Ultrasonic sensors", "Firebase"],
-            "contribution": "Sensor interfacing, zone logic, cloud push and simple web dashboard.",
-            "image": "/static/projects/parking.webp",
-            "repo": "https://github.com/YovenBlast/Smart-Parking-System",
-            "demo": "",
-            "video_url": "https://vimeo.com/1154608349?fl=ip&fe=ec",  # TODO: Add GitHub video URL
-            "images_url": "https://github.com/YovenBlast/Images/blob/main/PK1.webp"  # TODO: Add GitHub images folder URL
-        },
-        {
-            "id": "hotel_app",
-            "name": "Hotel Booking App (Flutter)",
-            "summary": "A Flutter hotel booking app with booking history and room management features.",
-            "stack": ["Flutter", "Dart", "Firebase"],
-            "contribution": "Built UI, booking logic, and integrated database helpers for images and room numbers.",
-            "image": "/static/projects/HotelBooking.png",
-            "repo": "https://github.com/YovenBlast/Hotel_Booking_System",
-            "demo": "",
-            "video_url": "",  # TODO: Add GitHub video URL
-            "images_url": "https://github.com/YovenBlast/Hotel_Booking_System_Images"  # TODO: Add GitHub images folder URL
-        },
-        {
-            "id": "trash_tamer",
-            "name": "Trash Tamer (Game)",
-            "summary": "A physics-based game built with Construct 3 including AdMob and Facebook sharing integrations.",
-            "stack": ["Construct 3", "AdMob", "Facebook OAuth"],
-            "contribution": "Game design, ad integration, and social sharing implementation.",
-            "image": "/static/projects/trash.jpg",
-            "repo": "https://github.com/YovenBlast/Trash_Tamer_Homepage",
-            "demo": "",
-            "video_url": "",  # TODO: Add GitHub video URL
-            "images_url": "https://github.com/YovenBlast/Trash_Tamer_Images"  # TODO: Add GitHub images folder URL
-        },
-        {
-            "id": "mq4_butane",
-            "name": "Butane Detection System",
-            "summary": "Butane gas detection using MQ4 sensor and ESP8266 with LED alerts and Firebase logging.",
-            "stack": ["ESP8266", "MQ4", "Firebase"],
-            "contribution": "Wiring, threshold logic, and cloud logging. Provided code to trigger LED on detection.",
-            "image": "/static/projects/mq4.jpg",
-            "repo": "https://github.com/YovenBlast/app_C-",
-            "demo": "",
-            "video_url": "",  # TODO: Add GitHub video URL
-            "images_url": ""  # TODO: Add GitHub images folder URL
-        },
-        {
-            "id": "java_datetime",
-            "name": "Java Date & Time Adjustment Program",
-            "summary": "A console-based Java application that validates dates, detects leap years, and automatically adjusts time when adding hours, minutes, or seconds.",
-            "stack": ["Java", "Scanner", "Algorithms"],
-            "contribution": "Built full date-time logic: leap year detection, input validation, automatic rollover of time and date.",
-            "image": "/static/projects/java1.jpg",
-            "repo": "https://github.com/YovenBlast/app_java",
-            "demo": "",
-            "video_url": "",  # TODO: Add GitHub video URL
-            "images_url": ""  # TODO: Add GitHub images folder URL
-        }
-    ]
+# Static assets (served fingerprinted from /assets/, see asset_url())
+# ---------------------------
+SITE_CSS = '''
+:root {
+  --bg-primary: #0f172a;
+  --bg-secondary: #07132a;
+  --text-primary: #e6eef8;
+  --text-secondary: #94a3b8;
+  --card-bg: rgba(255,255,255,0.03);
+  --accent: #7dd3fc;
+  --skill-badge-bg: rgba(255,255,255,0.05);
+  --skill-badge-text: #ffffff;
+  --border-color: rgba(255,255,255,0.1);
 }
 
-# ---------------------------
-# Templates
-# ---------------------------
-BASE_HTML = '''
-<!doctype html>
-<html lang="en" data-theme="dark">
-  <head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <title>{{ data.name }} - Portfolio</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link href="https://unpkg.com/aos@2.3.1/dist/aos.css" rel="stylesheet">
-    <style>
-      :root {
-        --bg-primary: #0f172a;
-        --bg-secondary: #07132a;
-        --text-primary: #e6eef8;
-        --text-secondary: #94a3b8;
-        --card-bg: rgba(255,255,255,0.03);
-        --accent: #7dd3fc;
-        --skill-badge-bg: rgba(255,255,255,0.05);
-        --skill-badge-text: #ffffff;
-        --border-color: rgba(255,255,255,0.1);
-      }
+[data-theme="light"] {
+  --bg-primary: #f8fafc;
+  --bg-secondary: #e2e8f0;
+  --text-primary: #1e293b;
+  --text-secondary: #475569;
+  --card-bg: #ffffff;
+  --accent: #0284c7;
+  --skill-badge-bg: #e0f2fe;
+  --skill-badge-text: #0c4a6e;
+  --border-color: #cbd5e1;
+}
 
-      [data-theme="light"] {
-        --bg-primary: #f8fafc;
-        --bg-secondary: #e2e8f0;
-        --text-primary: #1e293b;
-        --text-secondary: #475569;
-        --card-bg: #ffffff;
-        --accent: #0284c7;
-        --skill-badge-bg: #e0f2fe;
-        --skill-badge-text: #0c4a6e;
-        --border-color: #cbd5e1;
-      }
+body { 
+  background: linear-gradient(180deg, var(--bg-primary) 0%, var(--bg-secondary) 100%); 
+  color: var(--text-primary);
+  transition: background 0.3s ease, color 0.3s ease;
+  min-height: 100vh;
+}
 
-      body { 
-        background: linear-gradient(180deg, var(--bg-primary) 0%, var(--bg-secondary) 100%); 
-        color: var(--text-primary);
-        transition: background 0.3s ease, color 0.3s ease;
-        min-height: 100vh;
-      }
+.card { 
+  background: var(--card-bg); 
+  border: 1px solid var(--border-color);
+  transition: all 0.3s ease;
+}
 
-      .card { 
-        background: var(--card-bg); 
-        border: 1px solid var(--border-color);
-        transition: all 0.3s ease;
-      }
+.accent { color: var(--accent); }
+
+.skill-badge { 
+  background: var(--skill-badge-bg); 
+  color: var(--skill-badge-text);
+  padding: 6px 12px; 
+  border-radius: 999px; 
+  margin: 4px; 
+  display: inline-block;
+  transition: all 0.3s ease;
+  cursor: pointer;
+  border: 1px solid transparent;
+}
 
-      .accent { color: var(--accent); }
-
-      .skill-badge { 
-        background: var(--skill-badge-bg); 
-        color: var(--skill-badge-text);
-        padding: 6px 12px; 
-        border-radius: 999px; 
-        margin: 4px; 
-        display: inline-block;
-        transition: all 0.3s ease;
-        cursor: pointer;
-        border: 1px solid transparent;
-      }
+.skill-badge.active {
+  border-color: var(--accent);
+  color: var(--accent);
+}
 
-      .skill-badge:hover {
-        transform: translateY(-3px) scale(1.05);
-        box-shadow: 0 4px 12px rgba(125, 211, 252, 0.3);
-        border-color: var(--accent);
-        background: var(--accent);
-        color: #ffffff;
-      }
+.skill-badge:hover {
+  transform: translateY(-3px) scale(1.05);
+  box-shadow: 0 4px 12px rgba(125, 211, 252, 0.3);
+  border-color: var(--accent);
+  background: var(--accent);
+  color: #ffffff;
+}
 
-      .hero { padding: 60px 0; }
+.hero { padding: 60px 0; }
 
-      .profile-img { 
-        width: 160px; 
-        height: 160px; 
-        object-fit: cover; 
-        border-radius: 50%; 
-        box-shadow: 0 8px 30px rgba(0,0,0,0.6); 
-        border: 4px solid var(--border-color);
-        transition: border-color 0.3s ease;
-      }
+.profile-img { 
+  width: 160px; 
+  height: 160px; 
+  object-fit: cover; 
+  border-radius: 50%; 
+  box-shadow: 0 8px 30px rgba(0,0,0,0.6); 
+  border: 4px solid var(--border-color);
+  transition: border-color 0.3s ease;
+}
 
-      .project-img { 
-        width: 100%; 
-        height: 180px; 
-        object-fit: cover; 
-        border-radius: 8px;
-        filter: brightness(1.1);
-      }
+.project-img { 
+  width: 100%; 
+  height: 180px; 
+  object-fit: cover; 
+  border-radius: 8px;
+  filter: brightness(1.1);
+}
 
-      a.glow { 
-        text-decoration: none; 
-        border-bottom: 1px dashed rgba(125,211,252,0.4); 
-      }
+a.glow { 
+  text-decoration: none; 
+  border-bottom: 1px dashed rgba(125,211,252,0.4); 
+}
 
-      footer { 
-        opacity: 0.7; 
-        padding: 30px 0; 
-      }
+footer { 
+  opacity: 0.7; 
+  padding: 30px 0; 
+}
 
-      .card h4,
-      .card h5, 
-      .card h6,
-      .card p, 
-      .card strong {
-        color: var(--text-primary) !important;
-        opacity: 1 !important;
-      }
+.card h4,
+.card h5, 
+.card h6,
+.card p, 
+.card strong {
+  color: var(--text-primary) !important;
+  opacity: 1 !important;
+}
 
-      .form-label {
-        color: var(--text-primary) !important;
-      }
+.form-label {
+  color: var(--text-primary) !important;
+}
 
-      h3 {
-        color: var(--text-primary) !important;
-      }
+h3 {
+  color: var(--text-primary) !important;
+}
 
-      .card-body h5 {
-        color: var(--text-primary) !important;
-      }
+.card-body h5 {
+  color: var(--text-primary) !important;
+}
 
-      .cert-item {
-        padding: 12px 0;
-        border-bottom: 1px solid var(--border-color);
-      }
+.cert-item {
+  padding: 12px 0;
+  border-bottom: 1px solid var(--border-color);
+}
 
-      .cert-item:last-child {
-        border-bottom: none;
-      }
+.cert-item:last-child {
+  border-bottom: none;
+}
 
-      .task-item {
-        padding: 4px 0;
-        padding-left: 20px;
-        position: relative;
-        color: var(--text-primary) !important;
-      }
+.task-item {
+  padding: 4px 0;
+  padding-left: 20px;
+  position: relative;
+  color: var(--text-primary) !important;
+}
 
-      .task-item:before {
-        content: "•";
-        position: absolute;
-        left: 8px;
-        color: var(--accent);
-      }
+.task-item:before {
+  content: "•";
+  position: absolute;
+  left: 8px;
+  color: var(--accent);
+}
 
-      /* Theme Toggle Button */
-      .theme-toggle {
-        position: fixed;
-        top: 20px;
-        right: 20px;
-        z-index: 1000;
-        background: var(--card-bg);
-        border: 1px solid var(--border-color);
-        border-radius: 50%;
-        width: 50px;
-        height: 50px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        cursor: pointer;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-      }
+/* Theme Toggle Button */
+.theme-toggle {
+  position: fixed;
+  top: 20px;
+  right: 20px;
+  z-index: 1000;
+  background: var(--card-bg);
+  border: 1px solid var(--border-color);
+  border-radius: 50%;
+  width: 50px;
+  height: 50px;
+  display: flex;
+  align-items: center;
+  justify-content: center;
+  cursor: pointer;
+  transition: all 0.3s ease;
+  box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+}
 
-      .theme-toggle:hover {
-        transform: scale(1.1);
-        box-shadow: 0 6px 20px rgba(125, 211, 252, 0.3);
-      }
+.theme-toggle:hover {
+  transform: scale(1.1);
+  box-shadow: 0 6px 20px rgba(125, 211, 252, 0.3);
+}
 
-      .theme-toggle svg {
-        width: 24px;
-        height: 24px;
-        fill: var(--text-primary);
-      }
+.theme-toggle svg {
+  width: 24px;
+  height: 24px;
+  fill: var(--text-primary);
+}
 
-      .navbar {
-        background: var(--card-bg) !important;
-        border-bottom: 1px solid var(--border-color);
-      }
+.navbar {
+  background: var(--card-bg) !important;
+  border-bottom: 1px solid var(--border-color);
+}
 
-      .nav-link {
-        color: var(--text-secondary) !important;
-      }
+.nav-link {
+  color: var(--text-secondary) !important;
+}
 
-      .nav-link:hover {
-        color: var(--accent) !important;
-      }
+.nav-link:hover {
+  color: var(--accent) !important;
+}
 
-      .btn-outline-light {
-        border-color: var(--border-color);
-        color: var(--text-primary);
-      }
+.btn-outline-light {
+  border-color: var(--border-color);
+  color: var(--text-primary);
+}
 
-      .btn-outline-light:hover {
-        background: var(--accent);
-        border-color: var(--accent);
-        color: #ffffff;
-      }
+.btn-outline-light:hover {
+  background: var(--accent);
+  border-color: var(--accent);
+  color: #ffffff;
+}
 
-      .form-control {
-        background: var(--card-bg);
-        border-color: var(--border-color);
-        color: var(--text-primary);
-      }
+.form-control {
+  background: var(--card-bg);
+  border-color: var(--border-color);
+  color: var(--text-primary);
+}
 
-      .form-control:focus {
-        background: var(--card-bg);
-        border-color: var(--accent);
-        color: var(--text-primary);
-      }
+.form-control:focus {
+  background: var(--card-bg);
+  border-color: var(--accent);
+  color: var(--text-primary);
+}
 
-      [data-theme="light"] .text-muted {
-        color: var(--text-secondary) !important;
-      }
+[data-theme="light"] .text-muted {
+  color: var(--text-secondary) !important;
+}
 
-      .media-section {
-        margin-top: 20px;
-        padding-top: 20px;
-        border-top: 1px solid var(--border-color);
-      }
+.media-section {
+  margin-top: 20px;
+  padding-top: 20px;
+  border-top: 1px solid var(--border-color);
+}
 
-      .video-container {
-        position: relative;
-        padding-bottom: 56.25%; /* 16:9 aspect ratio */
-        height: 0;
-        overflow: hidden;
-        border-radius: 8px;
-        margin-bottom: 15px;
-      }
+.video-container {
+  position: relative;
+  padding-bottom: 56.25%; /* 16:9 aspect ratio */
+  height: 0;
+  overflow: hidden;
+  border-radius: 8px;
+  margin-bottom: 15px;
+}
 
-      .video-container video {
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        border-radius: 8px;
-      }
-    </style>
+.pagination .page-link {
+  background: var(--card-bg);
+  border-color: var(--border-color);
+  color: var(--text-primary);
+}
+
+.pagination .active .page-link {
+  background: var(--accent);
+  border-color: var(--accent);
+}
+
+.video-container video {
+  position: absolute;
+  top: 0;
+  left: 0;
+  width: 100%;
+  height: 100%;
+  border-radius: 8px;
+}
+'''
+
+SITE_JS = '''
+AOS.init();
+
+// Theme Toggle Functionality
+function toggleTheme() {
+  const html = document.documentElement;
+  const currentTheme = html.getAttribute('data-theme');
+  const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
+
+  html.setAttribute('data-theme', newTheme);
+  localStorage.setItem('theme', newTheme);
+
+  // Toggle icons
+  const sunIcon = document.getElementById('theme-icon-sun');
+  const moonIcon = document.getElementById('theme-icon-moon');
+
+  if (newTheme === 'light') {
+    sunIcon.style.display = 'none';
+    moonIcon.style.display = 'block';
+  } else {
+    sunIcon.style.display = 'block';
+    moonIcon.style.display = 'none';
+  }
+}
+
+// Load saved theme on page load
+document.addEventListener('DOMContentLoaded', function() {
+  const savedTheme = localStorage.getItem('theme') || 'dark';
+  document.documentElement.setAttribute('data-theme', savedTheme);
+
+  const sunIcon = document.getElementById('theme-icon-sun');
+  const moonIcon = document.getElementById('theme-icon-moon');
+
+  if (savedTheme === 'light') {
+    sunIcon.style.display = 'none';
+    moonIcon.style.display = 'block';
+  } else {
+    sunIcon.style.display = 'block';
+    moonIcon.style.display = 'none';
+  }
+});
+
+// Offline copy and instant repeat visits, see /sw.js
+if ('serviceWorker' in navigator) {
+  window.addEventListener('load', function() {
+    navigator.serviceWorker.register('/sw.js');
+  });
+}
+'''
+
+# Icon sprite symbols: name -> (viewBox, path data). Rendered with icon().
+ICONS = {
+    'github': ('0 0 16 16', 'M8 0C3.58 0 0 3.58 0 8c0 3.54 2.29 6.53 5.47 7.59.4.07.55-.17.55-.38 0-.19-.01-.82-.01-1.49-2.01.37-2.53-.49-2.69-.94-.09-.23-.48-.94-.82-1.13-.28-.15-.68-.52-.01-.53.63-.01 1.08.58 1.23.82.72 1.21 1.87.87 2.33.66.07-.52.28-.87.51-1.07-1.78-.2-3.64-.89-3.64-3.95 0-.87.31-1.59.82-2.15-.08-.2-.36-1.02.08-2.12 0 0 .67-.21 2.2.82.64-.18 1.32-.27 2-.27.68 0 1.36.09 2 .27 1.53-1.04 2.2-.82 2.2-.82.44 1.1.16 1.92.08 2.12.51.56.82 1.27.82 2.15 0 3.07-1.87 3.75-3.65 3.95.29.25.54.73.54 1.48 0 1.07-.01 1.93-.01 2.2 0 .21.15.46.55.38A8.012 8.012 0 0 0 16 8c0-4.42-3.58-8-8-8z'),
+    'sun': ('0 0 24 24', 'M12 18C8.68629 18 6 15.3137 6 12C6 8.68629 8.68629 6 12 6C15.3137 6 18 8.68629 18 12C18 15.3137 15.3137 18 12 18ZM12 16C14.2091 16 16 14.2091 16 12C16 9.79086 14.2091 8 12 8C9.79086 8 8 9.79086 8 12C8 14.2091 9.79086 16 12 16ZM11 1H13V4H11V1ZM11 20H13V23H11V20ZM3.51472 4.92893L4.92893 3.51472L7.05025 5.63604L5.63604 7.05025L3.51472 4.92893ZM16.9497 18.364L18.364 16.9497L20.4853 19.0711L19.0711 20.4853L16.9497 18.364ZM19.0711 3.51472L20.4853 4.92893L18.364 7.05025L16.9497 5.63604L19.0711 3.51472ZM5.63604 16.9497L7.05025 18.364L4.92893 20.4853L3.51472 19.0711L5.63604 16.9497ZM23 11V13H20V11H23ZM4 11V13H1V11H4Z'),
+    'moon': ('0 0 24 24', 'M10 7C10 10.866 13.134 14 17 14C18.9584 14 20.729 13.1957 21.9995 11.8995C22 11.933 22 11.9665 22 12C22 17.5228 17.5228 22 12 22C6.47715 22 2 17.5228 2 12C2 6.47715 6.47715 2 12 2C12.0335 2 12.067 2 12.1005 2.00049C10.8043 3.27098 10 5.04157 10 7ZM4 12C4 16.4183 7.58172 20 12 20C15.0583 20 17.7158 18.2839 19.062 15.7621C18.3945 15.9187 17.7035 16 17 16C12.0294 16 8 11.9706 8 7C8 6.29648 8.08133 5.60547 8.2379 4.938C5.71611 6.28423 4 8.9417 4 12Z'),
+}
+
+# ---------------------------
+# Templates
+# ---------------------------
+BASE_HTML = '''
+<!doctype html>
+<html lang="en" data-theme="dark">
+  <head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>{{ data.name }} - Portfolio</title>
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">
+    <link href="https://unpkg.com/aos@2.3.1/dist/aos.css" rel="stylesheet">
+    <link href="{{ asset_url('site.css') }}" rel="stylesheet">
+    {% block head %}{% endblock %}
   </head>
   <body>
     <!-- Theme Toggle Button -->
     <button class="theme-toggle" onclick="toggleTheme()" aria-label="Toggle theme">
-      <svg id="theme-icon-sun" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" style="display: none;">
-        <path d="M12 18C8.68629 18 6 15.3137 6 12C6 8.68629 8.68629 6 12 6C15.3137 6 18 8.68629 18 12C18 15.3137 15.3137 18 12 18ZM12 16C14.2091 16 16 14.2091 16 12C16 9.79086 14.2091 8 12 8C9.79086 8 8 9.79086 8 12C8 14.2091 9.79086 16 12 16ZM11 1H13V4H11V1ZM11 20H13V23H11V20ZM3.51472 4.92893L4.92893 3.51472L7.05025 5.63604L5.63604 7.05025L3.51472 4.92893ZM16.9497 18.364L18.364 16.9497L20.4853 19.0711L19.0711 20.4853L16.9497 18.364ZM19.0711 3.51472L20.4853 4.92893L18.364 7.05025L16.9497 5.63604L19.0711 3.51472ZM5.63604 16.9497L7.05025 18.364L4.92893 20.4853L3.51472 19.0711L5.63604 16.9497ZM23 11V13H20V11H23ZM4 11V13H1V11H4Z"/>
-      </svg>
-      <svg id="theme-icon-moon" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">
-        <path d="M10 7C10 10.866 13.134 14 17 14C18.9584 14 20.729 13.1957 21.9995 11.8995C22 11.933 22 11.9665 22 12C22 17.5228 17.5228 22 12 22C6.47715 22 2 17.5228 2 12C2 6.47715 6.47715 2 12 2C12.0335 2 12.067 2 12.1005 2.00049C10.8043 3.27098 10 5.04157 10 7ZM4 12C4 16.4183 7.58172 20 12 20C15.0583 20 17.7158 18.2839 19.062 15.7621C18.3945 15.9187 17.7035 16 17 16C12.0294 16 8 11.9706 8 7C8 6.29648 8.08133 5.60547 8.2379 4.938C5.71611 6.28423 4 8.9417 4 12Z"/>
-      </svg>
+      {{ icon('sun', id='theme-icon-sun', style='display: none;') }}
+      {{ icon('moon', id='theme-icon-moon') }}
     </button>
 
     <nav class="navbar navbar-expand-lg navbar-dark">
@@ -422,6 +392,7 @@ BASE_HTML = '''
             <li class="nav-item"><a class="nav-link" href="#projects">Projects</a></li>
             <li class="nav-item"><a class="nav-link" href="#experience">Experience</a></li>
             <li class="nav-item"><a class="nav-link" href="#contact">Contact</a></li>
+            <li class="nav-item"><a class="nav-link" href="/search">Search</a></li>
           </ul>
         </div>
       </div>
@@ -432,64 +403,25 @@ BASE_HTML = '''
     </main>
 
     <footer class="text-center">
-      <div class="container">Maheswaren Chinnasamy + Portfolio • {{ data.location }} • <a class="glow" href="{{ data.github }}">GitHub</a></div>
+      <div class="container">{{ data.name }} + Portfolio • {{ data.location }} • <a class="glow" href="{{ data.github }}">GitHub</a></div>
     </footer>
 
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>
     <script src="https://unpkg.com/aos@2.3.1/dist/aos.js"></script>
-    <script>
-      AOS.init();
-
-      // Theme Toggle Functionality
-      function toggleTheme() {
-        const html = document.documentElement;
-        const currentTheme = html.getAttribute('data-theme');
-        const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-
-        html.setAttribute('data-theme', newTheme);
-        localStorage.setItem('theme', newTheme);
-
-        // Toggle icons
-        const sunIcon = document.getElementById('theme-icon-sun');
-        const moonIcon = document.getElementById('theme-icon-moon');
-
-        if (newTheme === 'light') {
-          sunIcon.style.display = 'none';
-          moonIcon.style.display = 'block';
-        } else {
-          sunIcon.style.display = 'block';
-          moonIcon.style.display = 'none';
-        }
-      }
-
-      // Load saved theme on page load
-      document.addEventListener('DOMContentLoaded', function() {
-        const savedTheme = localStorage.getItem('theme') || 'dark';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-
-        const sunIcon = document.getElementById('theme-icon-sun');
-        const moonIcon = document.getElementById('theme-icon-moon');
-
-        if (savedTheme === 'light') {
-          sunIcon.style.display = 'none';
-          moonIcon.style.display = 'block';
-        } else {
-          sunIcon.style.display = 'block';
-          moonIcon.style.display = 'none';
-        }
-      });
-    </script>
+    <script src="{{ asset_url('site.js') }}"></script>
   </body>
 </html>
 '''
 
 INDEX_HTML = '''
-{% extends 'base' %}
+{% extends 'base.html' %}
+{% from 'cards.html' import project_card, pager, pager_links %}
+{% block head %}{{ pager_links(projects_page) }}{% endblock %}
 {% block content %}
 <section class="hero text-center text-light">
   <div class="row align-items-center">
     <div class="col-md-4 text-md-start text-center" data-aos="fade-right">
-      <img src="{{ data.profile_image }}" alt="profile" class="profile-img mb-3">
+      {{ responsive_img(data.profile_image, 'profile', sizes='160px', loading='eager', class='profile-img mb-3') }}
     </div>
     <div class="col-md-8" data-aos="fade-left">
       <h1 class="display-6">{{ data.name }}</h1>
@@ -524,17 +456,13 @@ INDEX_HTML = '''
       <div class="card p-4">
         <h4>Education & Experience</h4>
 
-        <!-- CIM Finance (Present - Most Recent) -->
-        <p><strong>Working at CIM</strong> — CIM Finance Services Ltd <br><small>Present</small><br>I work in software testing and development, doing forms, AI integration, and automations.</p>
-
-        <hr>
+        <!-- Most recent first; content lists experience oldest first -->
+        {% for exp in data.experience|reverse %}
+          <p><strong>{{ exp.role }}</strong> — {{ exp.company }} <br><small>{{ exp.date }}</small><br>{{ exp.details }}</p>
 
-        <!-- SD Worx Internship (March 2024) -->
-        <p><strong>Software Tester Intern</strong> — SD Worx Mauritius <br><small>March 2024</small><br>Worked on real-world testing tasks; learned teamwork, workflows, and testing tools.</p>
-
-        <hr>
+          <hr>
+        {% endfor %}
 
-        <!-- Education (Expected Feb 2025 - Oldest) -->
         {% for edu in data.education %}
           <p><strong>{{ edu.degree }}</strong><br>{{ edu.school }} — <small>{{ edu.date }}</small></p>
         {% endfor %}
@@ -549,13 +477,15 @@ INDEX_HTML = '''
     <div class="col-12" data-aos="fade-up">
       <div class="card p-4">
         {% for cert in data.certifications %}
+          {% cache 'certification', cert %}
           <div class="cert-item">
             <h6 class="mb-1">{{ cert.name }}</h6>
             <p class="mb-1"><strong>{{ cert.issuer }}</strong> — <small>{{ cert.date }}</small></p>
-            {% if cert.credential_url %}
+            {% if cert.credential_url and not link_broken(cert.credential_url) %}
               <a href="{{ cert.credential_url }}" target="_blank" class="btn btn-sm btn-outline-light mt-2">View Credential</a>
             {% endif %}
           </div>
+          {% endcache %}
         {% endfor %}
       </div>
     </div>
@@ -565,31 +495,18 @@ INDEX_HTML = '''
 <section id="projects" class="my-5">
   <h3 data-aos="fade-up">Projects</h3>
   <div class="row">
-    {% for p in data.projects %}
-      <div class="col-md-6 col-lg-4 mb-4" data-aos="zoom-in">
-        <div class="card h-100 p-3">
-          <img src="{{ p.image }}" class="project-img" alt="{{ p.name }}">
-          <div class="card-body">
-            <h5>{{ p.name }}</h5>
-            <p>{{ p.summary }}</p>
-            <div class="mb-2">
-              {% for t in p.stack %}
-                <span class="skill-badge">{{ t }}</span>
-              {% endfor %}
-            </div>
-            <a href="/project/{{ p.id }}" class="btn btn-outline-light btn-sm">Read more</a>
-            {% if p.repo %}<a href="{{ p.repo }}" class="btn btn-light btn-sm ms-2" target="_blank">Code</a>{% endif %}
-          </div>
-        </div>
-      </div>
+    {% for p in projects_page['items'] %}
+      {% cache 'project_card', p %}{{ project_card(p) }}{% endcache %}
     {% endfor %}
   </div>
+  {{ pager(projects_page) }}
 </section>
 
 <section id="experience" class="my-5">
   <h3 data-aos="fade-up">Experience Highlights</h3>
   <div class="row">
     {% for exp in data.experience %}
+      {% cache 'experience', exp %}
       <div class="col-md-6" data-aos="fade-up" data-aos-delay="50">
         <div class="card p-3 mb-3">
           <h5>{{ exp.role }}@ {{ exp.company }}</small></h5>
@@ -613,18 +530,17 @@ INDEX_HTML = '''
               {% endfor %}
             </div>
           {% endif %}
-          {% if exp.role == "Software Tester Intern" %}
+          {% if exp.testimonials_url and not link_broken(exp.testimonials_url) %}
             <div class="mt-3">
-              <a class="btn btn-outline-light btn-sm" href="{{ data.github }}" target="_blank">
-                <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" class="bi bi-github me-2" viewBox="0 0 16 16">
-                  <path d="M8 0C3.58 0 0 3.58 0 8c0 3.54 2.29 6.53 5.47 7.59.4.07.55-.17.55-.38 0-.19-.01-.82-.01-1.49-2.01.37-2.53-.49-2.69-.94-.09-.23-.48-.94-.82-1.13-.28-.15-.68-.52-.01-.53.63-.01 1.08.58 1.23.82.72 1.21 1.87.87 2.33.66.07-.52.28-.87.51-1.07-1.78-.2-3.64-.89-3.64-3.95 0-.87.31-1.59.82-2.15-.08-.2-.36-1.02.08-2.12 0 0 .67-.21 2.2.82.64-.18 1.32-.27 2-.27.68 0 1.36.09 2 .27 1.53-1.04 2.2-.82 2.2-.82.44 1.1.16 1.92.08 2.12.51.56.82 1.27.82 2.15 0 3.07-1.87 3.75-3.65 3.95.29.25.54.73.54 1.48 0 1.07-.01 1.93-.01 2.2 0 .21.15.46.55.38A8.012 8.012 0 0 0 16 8c0-4.42-3.58-8-8-8z"/>
-                </svg>
+              <a class="btn btn-outline-light btn-sm" href="{{ exp.testimonials_url }}" target="_blank">
+                {{ icon('github', class='bi bi-github me-2') }}
                 View My Testimonials on GitHub
               </a>
             </div>
           {% endif %}
         </div>
       </div>
+      {% endcache %}
     {% endfor %}
   </div>
 </section>
@@ -636,9 +552,9 @@ INDEX_HTML = '''
       <div class="card p-4">
         <h5>Contact</h5>
         <p>Email: <a href="mailto:{{ data.email }}">{{ data.email }}</a></p>
-        <p>LinkedIn: <a href="{{ data.linkedin }}" target="_blank">Profile</a></p>
-        <p>GitHub: <a href="{{ data.github }}" target="_blank">{{ data.github }}</a></p>
-        <p><a class="btn btn-outline-light" href="https://github.com/YovenBlast/CV/blob/main/CV%20M%20Chinnasamy_2025.pdf" target="_blank">Download CV</a></p>
+        <p>LinkedIn: <a href="{{ data.linkedin }}" target="_blank">Profile</a>{% if link_broken(data.linkedin) %} <small class="text-muted">(currently unreachable)</small>{% endif %}</p>
+        <p>GitHub: <a href="{{ data.github }}" target="_blank">{{ data.github }}</a>{% if link_broken(data.github) %} <small class="text-muted">(currently unreachable)</small>{% endif %}</p>
+        {% if data.cv_url and not link_broken(data.cv_url) %}<p><a class="btn btn-outline-light" href="{{ data.cv_url }}" target="_blank">Download CV</a></p>{% endif %}
       </div>
     </div>
     <div class="col-md-6" data-aos="fade-left">
@@ -658,7 +574,6 @@ INDEX_HTML = '''
             <textarea class="form-control" name="message"></textarea>
           </div>
           <button class="btn btn-outline-light">Send</button>
-          <small class="d-block mt-2 text-muted">(This demo form currently just shows a thank-you page.)</small>
         </form>
       </div>
     </div>
@@ -668,14 +583,14 @@ INDEX_HTML = '''
 '''
 
 PROJECT_HTML = '''
-{% extends 'base' %}
+{% extends 'base.html' %}
 {% block content %}
 <section class="my-5">
   <a href="/" class="btn btn-sm btn-outline-light mb-3">Back</a>
   <div class="card p-4">
     <div class="row">
       <div class="col-md-5">
-        <img src="{{ project.image }}" class="img-fluid rounded" alt="{{ project.name }}">
+        {{ responsive_img(project.image, project.name, sizes='(min-width: 768px) 40vw, 100vw', loading='eager', class='img-fluid rounded') }}
       </div>
       <div class="col-md-7">
         <h2>{{ project.name }}</h2>
@@ -684,12 +599,12 @@ PROJECT_HTML = '''
         <p>{% for s in project.stack %}<span class="skill-badge">{{ s }}</span>{% endfor %}</p>
         <h6>Contribution</h6>
         <p>{{ project.contribution }}</p>
-        {% if project.repo %}<p><a class="btn btn-sm btn-outline-light" href="{{ project.repo }}" target="_blank">View code</a></p>{% endif %}
+        {% if project.repo and not link_broken(project.repo) %}<p><a class="btn btn-sm btn-outline-light" href="{{ project.repo }}" target="_blank">View code</a></p>{% endif %}
       </div>
     </div>
 
     <!-- Project Video Section -->
-    {% if project.video_url %}
+    {% if project.video_url and not link_broken(project.video_url) %}
     <div class="media-section">
       <h5>Project Video</h5>
       <div class="video-container">
@@ -700,9 +615,7 @@ PROJECT_HTML = '''
       </div>
       <p class="text-center">
         <a href="{{ project.video_url }}" target="_blank" class="btn btn-sm btn-outline-light">
-          <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" class="bi bi-github me-2" viewBox="0 0 16 16">
-            <path d="M8 0C3.58 0 0 3.58 0 8c0 3.54 2.29 6.53 5.47 7.59.4.07.55-.17.55-.38 0-.19-.01-.82-.01-1.49-2.01.37-2.53-.49-2.69-.94-.09-.23-.48-.94-.82-1.13-.28-.15-.68-.52-.01-.53.63-.01 1.08.58 1.23.82.72 1.21 1.87.87 2.33.66.07-.52.28-.87.51-1.07-1.78-.2-3.64-.89-3.64-3.95 0-.87.31-1.59.82-2.15-.08-.2-.36-1.02.08-2.12 0 0 .67-.21 2.2.82.64-.18 1.32-.27 2-.27.68 0 1.36.09 2 .27 1.53-1.04 2.2-.82 2.2-.82.44 1.1.16 1.92.08 2.12.51.56.82 1.27.82 2.15 0 3.07-1.87 3.75-3.65 3.95.29.25.54.73.54 1.48 0 1.07-.01 1.93-.01 2.2 0 .21.15.46.55.38A8.012 8.012 0 0 0 16 8c0-4.42-3.58-8-8-8z"/>
-          </svg>
+          {{ icon('github', class='bi bi-github me-2') }}
           View Video on GitHub
         </a>
       </p>
@@ -710,15 +623,13 @@ PROJECT_HTML = '''
     {% endif %}
 
     <!-- Project Images Section -->
-    {% if project.images_url %}
+    {% if project.images_url and not link_broken(project.images_url) %}
     <div class="media-section">
       <h5>Project Images</h5>
       <p>View additional project screenshots and images on GitHub.</p>
       <p>
         <a href="{{ project.images_url }}" target="_blank" class="btn btn-sm btn-outline-light">
-          <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" class="bi bi-github me-2" viewBox="0 0 16 16">
-            <path d="M8 0C3.58 0 0 3.58 0 8c0 3.54 2.29 6.53 5.47 7.59.4.07.55-.17.55-.38 0-.19-.01-.82-.01-1.49-2.01.37-2.53-.49-2.69-.94-.09-.23-.48-.94-.82-1.13-.28-.15-.68-.52-.01-.53.63-.01 1.08.58 1.23.82.72 1.21 1.87.87 2.33.66.07-.52.28-.87.51-1.07-1.78-.2-3.64-.89-3.64-3.95 0-.87.31-1.59.82-2.15-.08-.2-.36-1.02.08-2.12 0 0 .67-.21 2.2.82.64-.18 1.32-.27 2-.27.68 0 1.36.09 2 .27 1.53-1.04 2.2-.82 2.2-.82.44 1.1.16 1.92.08 2.12.51.56.82 1.27.82 2.15 0 3.07-1.87 3.75-3.65 3.95.29.25.54.73.54 1.48 0 1.07-.01 1.93-.01 2.2 0 .21.15.46.55.38A8.012 8.012 0 0 0 16 8c0-4.42-3.58-8-8-8z"/>
-          </svg>
+          {{ icon('github', class='bi bi-github me-2') }}
           View Images on GitHub
         </a>
       </p>
@@ -729,51 +640,3212 @@ PROJECT_HTML = '''
 {% endblock %}
 '''
 
+CARDS_HTML = '''
+{% macro project_card(p) %}
+      <div class="col-md-6 col-lg-4 mb-4" data-aos="zoom-in">
+        <div class="card h-100 p-3">
+          {{ responsive_img(p.image, p.name, sizes='(min-width: 992px) 30vw, (min-width: 768px) 45vw, 100vw', class='project-img') }}
+          <div class="card-body">
+            <h5>{{ p.name }}</h5>
+            <p>{{ p.summary }}</p>
+            <div class="mb-2">
+              {% for t in p.stack %}
+                <span class="skill-badge">{{ t }}</span>
+              {% endfor %}
+            </div>
+            <a href="/project/{{ p.id }}" class="btn btn-outline-light btn-sm">Read more</a>
+            {% if p.repo and not link_broken(p.repo) %}<a href="{{ p.repo }}" class="btn btn-light btn-sm ms-2" target="_blank">Code</a>{% endif %}
+          </div>
+        </div>
+      </div>
+{% endmacro %}
+
+{% macro pager_links(page) %}
+    {% if page.prev %}<link rel="prev" href="{{ url_for('projects', page=page.prev, **(page.args or {})) }}">{% endif %}
+    {% if page.next %}<link rel="next" href="{{ url_for('projects', page=page.next, **(page.args or {})) }}">{% endif %}
+{% endmacro %}
+
+{% macro pager(page) %}
+  {% if page.pages > 1 %}
+  <nav aria-label="Project pages">
+    <ul class="pagination justify-content-center">
+      {% if page.prev %}<li class="page-item"><a class="page-link" rel="prev" href="{{ url_for('projects', page=page.prev, **(page.args or {})) }}">Previous</a></li>{% endif %}
+      {% for n in page.window %}
+        {% if n %}
+        <li class="page-item{% if n == page.page %} active{% endif %}"><a class="page-link" href="{{ url_for('projects', page=n, **(page.args or {})) }}">{{ n }}</a></li>
+        {% else %}
+        <li class="page-item disabled"><span class="page-link">&hellip;</span></li>
+        {% endif %}
+      {% endfor %}
+      {% if page.next %}<li class="page-item"><a class="page-link" rel="next" href="{{ url_for('projects', page=page.next, **(page.args or {})) }}">Next</a></li>{% endif %}
+    </ul>
+  </nav>
+  {% endif %}
+{% endmacro %}
+'''
+
+PROJECTS_HTML = '''
+{% extends 'base.html' %}
+{% from 'cards.html' import project_card, pager, pager_links %}
+{% block head %}{{ pager_links(projects_page) }}{% endblock %}
+{% block content %}
+<section id="projects" class="my-5">
+  <a href="/" class="btn btn-sm btn-outline-light mb-3">Back</a>
+  <h3>Projects <small class="text-muted">{{ projects_page.total }} total, page {{ projects_page.page }} of {{ projects_page.pages }}</small></h3>
+  <div class="mb-3" role="group" aria-label="Filter by technology">
+    {% for f in facets %}
+      <a href="{{ f.url }}" rel="nofollow" class="skill-badge{% if f.selected %} active{% endif %}"{% if f.selected %} aria-pressed="true"{% endif %}>{{ f.name }} <small>{{ f.count }}</small></a>
+    {% endfor %}
+    {% if selected|length > 1 %}<a href="{{ match_url }}" rel="nofollow" class="btn btn-sm btn-outline-light ms-2">Match {{ 'all' if match == 'any' else 'any' }}</a>{% endif %}
+    {% if selected %}<a href="{{ url_for('projects') }}" class="btn btn-sm btn-outline-light ms-2">Clear</a>{% endif %}
+  </div>
+  <div class="row">
+    {% for p in projects_page['items'] %}
+      {% cache 'project_card', p %}{{ project_card(p) }}{% endcache %}
+    {% endfor %}
+  </div>
+  {{ pager(projects_page) }}
+</section>
+{% endblock %}
+'''
+
 THANK_YOU_HTML = '''
-{% extends 'base' %}
+{% extends 'base.html' %}
 {% block content %}
 <section class="my-5 text-center">
   <div class="card p-4">
     <h3>Thank you, {{ name }}!</h3>
-    <p>Your message has been received. I will get back to you at {{ email }} (demo behavior).</p>
+    <p>Your message has been received. I will get back to you at {{ email }}.</p>
     <a href="/" class="btn btn-primary">Back to portfolio</a>
   </div>
 </section>
 {% endblock %}
 '''
 
+SEARCH_HTML = '''
+{% extends 'base.html' %}
+{% block content %}
+<section id="search" class="my-5">
+  <a href="/" class="btn btn-sm btn-outline-light mb-3">Back</a>
+  <form action="/search" method="get" role="search" class="mb-4">
+    <input type="search" name="q" value="{{ query }}" class="form-control" placeholder="Search projects, experience and certifications" aria-label="Search" autofocus>
+  </form>
+  {% if query %}
+  <h3>{{ results|length }} result{{ '' if results|length == 1 else 's' }} for &ldquo;{{ query }}&rdquo;</h3>
+  {% for r in results %}
+    <div class="card p-3 mb-2">
+      <h5 class="mb-1"><a href="{{ r.url }}" class="accent">{{ r.title }}</a> <span class="badge bg-secondary">{{ r.kind }}</span></h5>
+      {% if r.snippet %}<p class="mb-0">{{ r.snippet }}</p>{% endif %}
+    </div>
+  {% endfor %}
+  {% endif %}
+</section>
+{% endblock %}
+'''
+
 # ---------------------------
-# Register templates in Flask's template loader using render_template_string hack
+# Register templates in Flask's template loader
 # ---------------------------
-from jinja2 import DictLoader
-app.jinja_loader = DictLoader({
-    'base': BASE_HTML,
+import jinja2
+from jinja2 import DictLoader, FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup, escape
+# Compiled template code persists here across restarts ('' disables); see
+# template_bytecode_cache(). `flask --app app prepare` fills it at build time.
+app.config.setdefault('JINJA_CACHE_DIR', os.environ.get(
+    'JINJA_CACHE_DIR', os.path.join(app.instance_path, 'jinja-cache')))
+STARTUP_TIMES = {}  # seconds spent in each boot step, see `python bench.py startup`
+# Every name ends in .html: Flask only autoescapes templates with an HTML
+# suffix, and content (tenants' included) must never reach the page as markup.
+TEMPLATES = {
+    'base.html': BASE_HTML,
+    'cards.html': CARDS_HTML,
     'index.html': INDEX_HTML,
     'project.html': PROJECT_HTML,
+    'projects.html': PROJECTS_HTML,
+    'search.html': SEARCH_HTML,
     'thankyou.html': THANK_YOU_HTML,
-})
+}
+app.jinja_loader = DictLoader(TEMPLATES)
+# Drop the newline after block tags and the indentation before them, so
+# {% for %}/{% if %} lines don't leave blank lines in the rendered HTML.
+app.jinja_env.trim_blocks = True
+app.jinja_env.lstrip_blocks = True
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache 'name', item, ... %}...{% endcache %}: render the body once per key.
+
+    Content items in the key stand for their content digest, so after an
+    edit only the fragments of changed items render again; see
+    fragment_cache() for the rest of the key.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cache', [nodes.List(parts)]), [], [], body).set_lineno(lineno)
+
+    def _cache(self, parts, caller):
+        return fragment_cache(parts, caller)
+
+
+app.jinja_env.add_extension(FragmentCacheExtension)
+
+
+def template_bytecode_cache(directory):
+    """A FileSystemBytecodeCache under directory, or None when it is ''.
+
+    Jinja checks each cached entry against a checksum of the template
+    source, so edited templates recompile on their own. What the checksum
+    can't see (the Jinja release, extensions, block trimming) picks the
+    subdirectory, so changing those starts a fresh cache.
+    """
+    if not directory:
+        return None
+    env = app.jinja_env
+    settings = repr((jinja2.__version__, sorted(env.extensions), env.trim_blocks, env.lstrip_blocks))
+    directory = os.path.join(directory, hashlib.blake2b(settings.encode(), digest_size=8).hexdigest())
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory)
+
+
+app.jinja_env.bytecode_cache = template_bytecode_cache(app.config['JINJA_CACHE_DIR'])
+
+
+def compile_templates():
+    """Compile every registered template once into app.jinja_env's cache.
+
+    render_template() then reuses the compiled Template objects instead of
+    parsing BASE_HTML and the page template again on every request.
+    """
+    return {name: app.jinja_env.get_template(name) for name in TEMPLATES}
+
+
+_started = time.perf_counter()
+compile_templates()
+STARTUP_TIMES['compile_templates'] = time.perf_counter() - _started
+
+# ---------------------------
+# Minification
+# ---------------------------
+# Deliberately conservative: whitespace and comments only, never renaming or
+# reordering, so the output behaves exactly like the source.
+app.config.setdefault('COMPACT_HTML', True)
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_CSS_PUNCT = re.compile(r'\s*([{};,>])\s*')
+_HTML_RAW = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I)
+_HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.S)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def minify_css(text):
+    text = _CSS_COMMENT.sub('', text)
+    text = _WHITESPACE.sub(' ', text)
+    text = _CSS_PUNCT.sub(r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    """Strip indentation, blank lines and whole-line // comments.
+
+    Line breaks are kept so automatic semicolon insertion still applies.
+    """
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group(0) else ' '
+
+
+def compact_html(html):
+    """Remove comments and collapse whitespace runs outside raw-text elements.
+
+    Runs are collapsed to one character rather than removed, so the space
+    between inline elements (skill badges, buttons) still renders. <pre>,
+    <textarea>, <script> and <style> contents are left untouched.
+    """
+    parts = _HTML_RAW.split(html)
+    out = []
+    # split() with two groups yields: text, raw element, tag name, text, ...
+    for i in range(0, len(parts), 3):
+        text = _HTML_COMMENT.sub('', parts[i])
+        out.append(_WHITESPACE.sub(_collapse, text))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out).strip()
+
+
+def render_page(template_name, **context):
+    """render_template() followed by compact_html() when COMPACT_HTML is on."""
+    start = time.perf_counter()
+    html = render_template(template_name, **context)
+    if app.config['COMPACT_HTML']:
+        html = compact_html(html)
+    record_render(template_name, time.perf_counter() - start)
+    return html
+
+# ---------------------------
+# Fingerprinted assets
+# ---------------------------
+# CSS/JS that used to be inlined in BASE_HTML is served from
+# /assets/<name>.<hash>.<ext> with a far-future immutable Cache-Control, so
+# browsers download it once per content change instead of once per page.
+import mimetypes
+
+def build_sprite(icons):
+    """One SVG document holding a <symbol> per icon, referenced via <use>."""
+    symbols = ''.join(f'<symbol id="{name}" viewBox="{view_box}"><path d="{d}"/></symbol>'
+                      for name, (view_box, d) in icons.items())
+    return f'<svg xmlns="http://www.w3.org/2000/svg">{symbols}</svg>'
+
+
+ASSET_SOURCES = {
+    'site.css': minify_css(SITE_CSS),
+    'site.js': minify_js(SITE_JS),
+    'icons.svg': build_sprite(ICONS),
+}
+
+
+def build_assets(sources):
+    """Return {logical name: asset} with each asset's content-hashed URL name."""
+    assets = {}
+    for name, text in sources.items():
+        body = text.encode()
+        digest = hashlib.blake2b(body, digest_size=6).hexdigest()
+        stem, ext = os.path.splitext(name)
+        assets[name] = {
+            'body': body,
+            'filename': f'{stem}.{digest}{ext}',
+            'mimetype': mimetypes.guess_type(name)[0] or 'application/octet-stream',
+            'etag': digest,
+        }
+    return assets
+
+
+ASSETS = build_assets(ASSET_SOURCES)
+_assets_by_filename = {a['filename']: a for a in ASSETS.values()}
+
+
+@app.template_global()
+def asset_url(name):
+    """URL of the current fingerprinted copy of a registered asset."""
+    return '/assets/' + ASSETS[name]['filename']
+
+
+@app.template_global()
+def icon(name, size=None, **attrs):
+    """Inline <svg> that references `name` in the cached icon sprite.
+
+    Extra keyword arguments become attributes (use class= for CSS classes);
+    size defaults to the symbol's own viewBox size.
+    """
+    view_box = ICONS[name][0]
+    size = size or view_box.split()[2]
+    attrs.setdefault('fill', 'currentColor')
+    extra = ''.join(f' {key}="{escape(value)}"' for key, value in attrs.items())
+    return Markup(f'<svg width="{size}" height="{size}" aria-hidden="true"{extra}>'
+                  f'<use href="{asset_url("icons.svg")}#{name}"></use></svg>')
+
+
+@app.route('/assets/<filename>')
+def asset(filename):
+    entry = _assets_by_filename.get(filename)
+    if entry is None:
+        abort(404)
+    response = app.response_class(entry['body'], mimetype=entry['mimetype'])
+    response.set_etag(entry['etag'])
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+# ---------------------------
+# Responsive images
+# ---------------------------
+# /img/<path under static/>?w=320&fmt=webp resizes and transcodes a static
+# image once and serves later requests from a content-addressed disk cache.
+# responsive_img() emits the matching srcset/sizes markup in the query-less
+# form /img/<width>/<digest>/<path>.<fmt>, which is cached forever and which
+# `flask export` writes out as plain files. Without Pillow the
+# endpoint serves the original file and templates fall back to a plain <img>.
+from werkzeug.security import safe_join
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional: images are served unresized without Pillow
+    Image = ImageOps = None
+
+app.config.setdefault('IMAGE_CACHE_DIR', os.path.join(app.instance_path, 'img-cache'))
+
+# Requested widths are snapped up to one of these so the cache stays bounded.
+IMAGE_WIDTHS = (160, 320, 480, 640, 960, 1280)
+IMAGE_FORMATS = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+
+_image_info = {}  # (path, mtime_ns, size) -> {'digest', 'width', 'height'}
+
+
+def image_info(path):
+    """Content digest and intrinsic size of an image file, or None if missing.
+
+    The size is None when Pillow is missing or can't read the file.
+    """
+    if not os.path.isfile(path):  # /img/<directory> is a 404, not a crash in open()
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    info = _image_info.get(key)
+    if info is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+        width = height = None
+        if Image is not None:
+            try:
+                with Image.open(path) as im:
+                    width, height = ImageOps.exif_transpose(im).size
+            except (OSError, Image.DecompressionBombError):  # incl. UnidentifiedImageError
+                pass
+        info = _image_info[key] = {'digest': digest, 'width': width, 'height': height}
+    return info
+
+
+def static_image_path(src):
+    """Filesystem path for a /static/... URL, or None for anything else."""
+    if not src or not src.startswith('/static/'):
+        return None
+    return safe_join(app.static_folder, src[len('/static/'):])
+
+
+def image_stamp(data):
+    """Size/mtime of every local image the content references.
+
+    Part of the content version, since image digests end up in srcset URLs.
+    """
+    stamp = []
+    for src in [data['profile_image']] + [p['image'] for p in data['projects']]:
+        path = static_image_path(src)
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        stamp.append((src, st and (st.st_mtime_ns, st.st_size)))
+    return stamp
+
+
+def transcode_image(source, info, width, fmt):
+    """Return the cache path of `source` at `width` in `fmt`, creating it once."""
+    name = f"{info['digest']}-{width}.{fmt}"
+    target = os.path.join(app.config['IMAGE_CACHE_DIR'], name[:2], name)
+    if os.path.exists(target):
+        return target
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with Image.open(source) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.width > width:
+            im = im.resize((width, max(1, round(im.height * width / im.width))), Image.LANCZOS)
+        if fmt == 'jpeg' and im.mode not in ('RGB', 'L'):
+            im = im.convert('RGB')
+        # Write under a unique name and rename so concurrent workers never
+        # serve a half-written file.
+        tmp = f'{target}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            im.save(tmp, format=fmt.upper(), quality=80)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    os.replace(tmp, target)
+    return target
+
+
+def image_variant(source, info, requested, fmt):
+    """Cache path of `source` at the IMAGE_WIDTHS step at or above `requested`."""
+    width = next((w for w in IMAGE_WIDTHS if w >= requested), IMAGE_WIDTHS[-1])
+    return transcode_image(source, info, width, fmt)
+
+
+def image_response(filename, requested, fmt, digest):
+    source = safe_join(app.static_folder, filename)
+    info = source and image_info(source)
+    if not info:
+        abort(404)
+    if fmt not in IMAGE_FORMATS:
+        abort(400)
+    if info['width'] is None:
+        return send_file(source, conditional=True)
+    try:
+        target = image_variant(source, info, requested, fmt)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        # A file Pillow can measure but not decode (truncated, say): send it as is.
+        app.logger.error('cannot resize %s: %s', filename, exc)
+        return send_file(source, conditional=True)
+    # URLs from responsive_img() carry the source digest and never change
+    # meaning; bare or stale ones may, so only the former are cached forever.
+    immutable = digest == info['digest']
+    response = send_file(target, mimetype=IMAGE_FORMATS[fmt], conditional=True,
+                         max_age=31536000 if immutable else 3600)
+    response.cache_control.immutable = immutable or None
+    return response
+
+
+@app.route('/img/<int:width>/<digest>/<path:filename>')
+def image_versioned(width, digest, filename):
+    filename, _, fmt = filename.rpartition('.')
+    return image_response(filename, width, fmt, digest)
+
+
+@app.route('/img/<path:filename>')
+def image(filename):
+    return image_response(filename, request.args.get('w', IMAGE_WIDTHS[-1], type=int),
+                          request.args.get('fmt', 'webp'), request.args.get('v'))
+
+
+def image_sources(src, fmt='webp'):
+    """srcset candidates [(width, url)], default src and size of a local image.
+
+    None for external URLs and for images Pillow can't measure.
+    """
+    path = static_image_path(src)
+    info = image_info(path) if path else None
+    if not (info and info['width']):
+        return None
+    rel = src[len('/static/'):]
+    widths = ([w for w in IMAGE_WIDTHS if w < info['width']] + [info['width']])[:len(IMAGE_WIDTHS)]
+    srcset = [(w, f"/img/{w}/{info['digest']}/{rel}.{fmt}") for w in widths]
+    return {'srcset': srcset, 'src': srcset[min(len(srcset) - 1, 3)][1],
+            'width': info['width'], 'height': info['height']}
+
+
+@app.template_global()
+def responsive_img(src, alt, sizes='100vw', loading='lazy', fmt='webp', **attrs):
+    """<img> with srcset/sizes, explicit dimensions and lazy loading.
+
+    Only local /static/ images get a srcset; external URLs are emitted as-is.
+    Extra keyword arguments become attributes (use class= for CSS classes).
+    """
+    sources = image_sources(src, fmt)
+    attrs = {'alt': alt, 'loading': loading, 'decoding': 'async', **attrs}
+    if sources:
+        attrs.update({
+            'src': sources['src'],
+            'srcset': ', '.join(f'{url} {w}w' for w, url in sources['srcset']),
+            'sizes': sizes,
+            'width': sources['width'],
+            'height': sources['height'],
+        })
+    else:
+        attrs['src'] = src
+    return Markup('<img' + ''.join(f' {k}="{escape(v)}"' for k, v in attrs.items()) + '>')
+
+# ---------------------------
+# Content store
+# ---------------------------
+# Portfolio content lives in content.json (or CONTENT_PATH: .json, .yaml/.yml
+# or .toml), is validated against CONTENT_SCHEMA and published as an
+# immutable ContentSnapshot. A background thread in each worker polls the
+# file's mtime and swaps a new snapshot in with a single reference
+# assignment: requests bind one snapshot for their whole lifetime, so they
+# see the old content or the new, never a mix, and no request waits for a
+# reload. Everything derived from content (pages, indexes) is keyed by the
+# snapshot version and rolls over on its own.
+import tomllib
+from types import MappingProxyType
+from flask import g, has_request_context
+
+try:
+    import yaml
+except ImportError:  # optional: only needed for YAML content files
+    yaml = None
+
+app.config.setdefault('CONTENT_PATH', os.environ.get(
+    'CONTENT_PATH', os.path.join(app.root_path, 'content.json')))
+app.config.setdefault('CONTENT_POLL_INTERVAL', float(os.environ.get('CONTENT_POLL_INTERVAL', 2.0)))  # 0: never reload
+
+
+class ContentError(ValueError):
+    """Content that can't be parsed or doesn't match CONTENT_SCHEMA."""
+
+
+# A type, a [type] list, a nested object, {str: ...} for free-form keys, or
+# (schema, default) for optional keys. Unknown keys are kept as-is.
+_TEXT = (str, '')
+_TAGS = ([str], [])
+CONTENT_SCHEMA = {
+    'name': str,
+    'title': str,
+    'location': str,
+    'summary': str,
+    'profile_image': str,
+    'email': str,
+    'linkedin': _TEXT,
+    'github': _TEXT,
+    'cv_url': _TEXT,
+    'skills': {str: [str]},
+    'experience': [{'role': str, 'company': str, 'date': str, 'details': str,
+                    'technologies': _TAGS, 'position': _TEXT, 'tasks': _TAGS, 'testimonials_url': _TEXT}],
+    'education': [{'degree': str, 'school': str, 'date': str}],
+    'certifications': [{'name': str, 'issuer': str, 'date': str, 'credential_url': _TEXT}],
+    'projects': [{'id': str, 'name': str, 'summary': str, 'stack': _TAGS, 'contribution': _TEXT,
+                  'image': _TEXT, 'repo': _TEXT, 'demo': _TEXT, 'video_url': _TEXT,
+                  'images_url': _TEXT}],
+}
+
+
+def validate_content(value, schema=CONTENT_SCHEMA, path='content'):
+    """Check value against schema and return a copy with optional defaults filled in."""
+    if isinstance(schema, type):
+        if not isinstance(value, schema):
+            raise ContentError(f'{path}: expected {schema.__name__}, got {type(value).__name__}')
+        return value
+    if isinstance(schema, list):
+        if not isinstance(value, list):
+            raise ContentError(f'{path}: expected a list, got {type(value).__name__}')
+        return [validate_content(item, schema[0], f'{path}[{i}]') for i, item in enumerate(value)]
+    if not isinstance(value, dict):
+        raise ContentError(f'{path}: expected an object, got {type(value).__name__}')
+    if str in schema:
+        return {key: validate_content(item, schema[str], f'{path}.{key}') for key, item in value.items()}
+    out = dict(value)
+    for key, sub in schema.items():
+        if isinstance(sub, tuple):
+            sub, default = sub
+            if key not in value:
+                out[key] = type(default)(default)
+                continue
+        elif key not in value:
+            raise ContentError(f'{path}: missing required key {key!r}')
+        out[key] = validate_content(value[key], sub, f'{path}.{key}')
+    return out
+
+
+def freeze(value):
+    """Deep read-only view: dicts become mappingproxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Plain dict/list copy of frozen content, e.g. to edit and install again."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+_PARSE_ERRORS = (ValueError,) + ((yaml.YAMLError,) if yaml is not None else ())
+
+
+def read_content_file(path):
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        if ext in ('.yaml', '.yml'):
+            if yaml is None:
+                raise ContentError(f'{path}: install PyYAML to use YAML content')
+            return yaml.safe_load(raw)
+        if ext == '.toml':
+            return tomllib.loads(raw.decode())
+        return json.loads(raw)
+    except _PARSE_ERRORS as exc:
+        raise ContentError(f'{path}: {exc}') from exc
+
+
+def build_project_index(projects):
+    """Map project id -> project, refusing duplicate ids."""
+    index = {}
+    for p in projects:
+        if p['id'] in index:
+            raise ContentError(f"duplicate project id {p['id']!r} in projects")
+        index[p['id']] = p
+    return index
+
+
+# Asset fingerprints are part of the rendered HTML, so they feed the version too.
+_TEMPLATES_HASH = hashlib.blake2b(
+    json.dumps([TEMPLATES, sorted(a['filename'] for a in ASSETS.values())]).encode(),
+    digest_size=8).hexdigest()
+
+
+class ContentSnapshot:
+    """One validated, read-only version of the content plus data derived from it."""
+
+    def __init__(self, data, source, modified, tenant=''):
+        self.tenant = tenant
+        self.stamp = image_stamp(data)
+        digest = hashlib.blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=8)
+        digest.update(_TEMPLATES_HASH.encode())
+        digest.update(repr(self.stamp).encode())
+        self.version = digest.hexdigest()
+        self.data = freeze(data)
+        self.source = source
+        # Last-Modified: the newest of the content file and the images it uses.
+        self.modified = max([modified] + [st[0] / 1e9 for _, st in self.stamp if st])
+        self.project_index = build_project_index(self.data['projects'])
+        self._derived = {}
+
+    def derived(self, name, build):
+        """Return build() computed once for this snapshot."""
+        try:
+            return self._derived[name]
+        except KeyError:
+            value = self._derived[name] = build()
+            return value
+
+
+class ContentStore:
+    """Owns the current ContentSnapshot for one content file.
+
+    tenant is the host name the content is served for ('' for the default
+    site); it prefixes the store's page and API cache keys.
+    """
+
+    def __init__(self, path, tenant=''):
+        self.path = path
+        self.tenant = tenant
+        self.current = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            st = os.stat(self.path)
+            # Remember the signature before parsing so a broken file is
+            # reported once, not on every poll; the next edit retries.
+            self._signature = (st.st_mtime_ns, st.st_size)
+            data = validate_content(read_content_file(self.path))
+            self._publish(ContentSnapshot(data, self.path, st.st_mtime, self.tenant))
+
+    def install(self, data, source='<memory>'):
+        """Validate and publish content that doesn't come from the file."""
+        with self._lock:
+            self._publish(ContentSnapshot(validate_content(data), source, time.time(), self.tenant))
+
+    def reload_if_changed(self):
+        st = os.stat(self.path)
+        current = self.current
+        if ((st.st_mtime_ns, st.st_size) != self._signature
+                or (current is not None and image_stamp(current.data) != current.stamp)):
+            self.load()
+
+    def _publish(self, snapshot):
+        previous = self.current
+        if previous is not None:
+            if snapshot.version == previous.version:
+                return
+            # Last-Modified has one-second resolution; keep it strictly increasing.
+            snapshot.modified = max(snapshot.modified, previous.modified + 1)
+        self.current = snapshot  # the atomic swap
+        if previous is not None:
+            self.forget()
+
+    def forget(self):
+        """Drop this tenant's rendered pages and API responses."""
+        PAGE_CACHE.drop(self.tenant)
+        API_CACHE.drop(self.tenant)
+
+
+class ContentWatcher(threading.Thread):
+    """Polls content stores and reloads the ones whose files changed."""
+
+    def __init__(self, stores, interval):
+        super().__init__(name='content-watcher', daemon=True)
+        self.stores = stores
+        self.interval = interval
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                stores = self.stores()
+            except Exception:
+                app.logger.exception('content watcher: listing content stores failed')
+                continue
+            for store in stores:
+                try:
+                    store.reload_if_changed()
+                except (ContentError, OSError) as exc:
+                    app.logger.error('keeping previous content, reload failed: %s', exc)
+                except Exception:
+                    app.logger.exception('keeping previous content, reload failed')
+
+
+CONTENT = ContentStore(app.config['CONTENT_PATH'])
+_started = time.perf_counter()
+CONTENT.load()
+STARTUP_TIMES['load_content'] = time.perf_counter() - _started
+_watcher = {'pid': None}
+_watcher_lock = threading.Lock()
+
+
+@app.before_request
+def _start_content_watcher():
+    # One thread per worker process, started after fork.
+    interval = app.config['CONTENT_POLL_INTERVAL']
+    if interval and _watcher['pid'] != os.getpid():
+        with _watcher_lock:
+            if _watcher['pid'] != os.getpid():
+                ContentWatcher(content_stores, interval).start()
+                _watcher['pid'] = os.getpid()
+
+
+def content():
+    """The ContentSnapshot serving the current request.
+
+    Bound on first use so a reload mid-request can't mix two versions.
+    """
+    if has_request_context():
+        snapshot = g.get('content')
+        if snapshot is None:
+            snapshot = g.content = content_store().current
+            if snapshot is None:
+                abort(503)  # the tenant's content file doesn't validate; see the log
+        return snapshot
+    return CONTENT.current
+
+
+def install_content(data):
+    """Replace the served content in this process (tests, benchmarks, tools)."""
+    CONTENT.install(data)
+
+# ---------------------------
+# Tenants
+# ---------------------------
+# With TENANTS_DIR set, one deployment serves many portfolios: a request for
+# Host: jane.example.com gets TENANTS_DIR/jane.example.com.json (or .yaml,
+# .yml, .toml), and hosts without a file get the default CONTENT_PATH site.
+# Each tenant has its own ContentStore, loaded on its first request and
+# polled by the content watcher like the default one; templates, assets and
+# the memory-bounded page cache are shared, with cache keys and statistics
+# per tenant.
+app.config.setdefault('TENANTS_DIR', os.environ.get('TENANTS_DIR', ''))
+
+CONTENT_SUFFIXES = ('.json', '.yaml', '.yml', '.toml')  # preference order
+_HOST = re.compile(r'[a-z0-9][a-z0-9.-]*')
+
+
+class TenantRegistry:
+    """Host name -> ContentStore for every content file in a directory.
+
+    The directory listing is refreshed by the content watcher, so requests
+    for unknown hosts never touch the disk and new tenants appear within
+    CONTENT_POLL_INTERVAL seconds.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._paths = {}
+        self._stores = {}
+        self._lock = threading.Lock()
+        self.scan()
+
+    def scan(self):
+        paths = {}
+        for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+            stem, ext = os.path.splitext(entry.name.lower())
+            if ext in CONTENT_SUFFIXES and _HOST.fullmatch(stem) and entry.is_file():
+                previous = paths.get(stem)
+                if previous is None or CONTENT_SUFFIXES.index(ext) < CONTENT_SUFFIXES.index(previous[0]):
+                    paths[stem] = (ext, entry.path)
+        self._paths = {host: path for host, (_, path) in paths.items()}
+
+    def get(self, host):
+        """The tenant's ContentStore, or None when host has no content file."""
+        store = self._stores.get(host)
+        if store is None and host in self._paths:
+            with self._lock:
+                store = self._stores.get(host)
+                if store is None:
+                    store = ContentStore(self._paths[host], tenant=host)
+                    try:
+                        store.load()
+                    except (ContentError, OSError) as exc:
+                        app.logger.error('tenant %s: %s', host, exc)
+                    self._stores[host] = store
+        return store
+
+    def refresh(self):
+        """Rescan the directory, forget removed tenants and return the loaded stores.
+
+        If the directory can't be read, the last listing stays in effect.
+        """
+        try:
+            self.scan()
+        except OSError as exc:
+            app.logger.error('tenants: keeping the previous listing, scan failed: %s', exc)
+        with self._lock:
+            for host, store in list(self._stores.items()):
+                if self._paths.get(host) != store.path:
+                    del self._stores[host]
+                    store.forget()
+            return list(self._stores.values())
+
+
+TENANTS = TenantRegistry(app.config['TENANTS_DIR']) if app.config['TENANTS_DIR'] else None
+
+
+def request_host(req=request):
+    """The Host header without port, lowercased; '' if it isn't a plain host name."""
+    host = req.host.lower().rsplit(':', 1)[0]
+    return host if _HOST.fullmatch(host) else ''
+
+
+def content_store():
+    """The ContentStore serving the current request: its tenant's, or the default."""
+    store = g.get('content_store')
+    if store is None:
+        store = g.content_store = (TENANTS and TENANTS.get(request_host())) or CONTENT
+    return store
+
+
+def content_stores():
+    """Every loaded ContentStore, for the watchers."""
+    return [CONTENT] + (TENANTS.refresh() if TENANTS else [])
+
+# ---------------------------
+# Link health
+# ---------------------------
+# A background thread HEAD-checks every outbound URL in the content (repos,
+# videos, credentials, CV, profiles) with asyncio, at most
+# LINK_CHECK_CONCURRENCY connections at once and LINK_CHECK_PER_HOST per
+# host. Only the worker holding a lock on LINK_HEALTH_PATH.lock checks; the
+# others pick up its results from LINK_HEALTH_PATH. Results live in memory
+# for the templates (link_broken() never does I/O) and on disk, so workers
+# and restarts share them. A link is hidden or flagged only after
+# LINK_BROKEN_AFTER failed checks in a row, and the set of broken links is
+# part of the page version, so pages re-render when it changes.
+import asyncio
+import fcntl
+import ssl
+from urllib.parse import urljoin, urlsplit
+
+app.config.setdefault('LINK_CHECK_INTERVAL', float(os.environ.get('LINK_CHECK_INTERVAL', 300)))  # 0 disables
+app.config.setdefault('LINK_CHECK_TTL', 6 * 3600.0)
+app.config.setdefault('LINK_CHECK_TIMEOUT', 10.0)
+app.config.setdefault('LINK_CHECK_CONCURRENCY', 16)
+app.config.setdefault('LINK_CHECK_PER_HOST', 2)
+app.config.setdefault('LINK_CHECK_REDIRECTS', 5)
+app.config.setdefault('LINK_BROKEN_AFTER', 2)
+app.config.setdefault('LINK_HEALTH_PATH', os.environ.get(
+    'LINK_HEALTH_PATH', os.path.join(app.instance_path, 'link-health.json')))
+
+LINK_USER_AGENT = 'portfolio-link-check/1.0'
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+def content_links(data):
+    """Every distinct http(s) URL the pages link to."""
+    urls = [data['linkedin'], data['github'], data['cv_url']]
+    urls += [exp['testimonials_url'] for exp in data['experience']]
+    for proj in data['projects']:
+        urls += [proj['repo'], proj['demo'], proj['video_url'], proj['images_url']]
+    urls += [cert['credential_url'] for cert in data['certifications']]
+    return sorted({url for url in urls if url.startswith(('http://', 'https://'))})
+
+
+def link_failed(status, error):
+    """Whether one check counts against a link.
+
+    Timeouts and statuses sites use to turn away bots (401, 403, 429,
+    LinkedIn's 999) say nothing about the link, so they don't count.
+    """
+    if error is not None:
+        return error != 'timeout'
+    return status in (404, 410) or 500 <= status < 600
+
+
+class LinkChecker:
+    """Checks URLs concurrently with HEAD requests over plain asyncio streams."""
+
+    def __init__(self, timeout, concurrency, per_host, max_redirects):
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.max_redirects = max_redirects
+        self.ssl_context = ssl.create_default_context()
+
+    async def check_all(self, urls):
+        """Return {url: (final status or None, error or None)}."""
+        pool = asyncio.Semaphore(self.concurrency)
+        hosts = {}
+
+        async def check(url):
+            host = hosts.setdefault(urlsplit(url).hostname, asyncio.Semaphore(self.per_host))
+            # Wait for the host first so a busy host doesn't hold pool slots.
+            async with host, pool:
+                try:
+                    return url, await asyncio.wait_for(self.status(url), self.timeout), None
+                except asyncio.TimeoutError:
+                    return url, None, 'timeout'
+                except (OSError, ValueError) as exc:
+                    return url, None, f'{type(exc).__name__}: {exc}'
+
+        return {url: (status, error) for url, status, error in await asyncio.gather(*map(check, urls))}
+
+    async def status(self, url):
+        method = 'HEAD'
+        for _ in range(self.max_redirects + 1):
+            status, location = await self.request(method, url)
+            if status in REDIRECT_STATUSES and location:
+                url = urljoin(url, location)
+            elif status in (405, 501) and method == 'HEAD':
+                method = 'GET'  # HEAD not allowed; only the status line is read
+            else:
+                return status
+        raise ValueError('too many redirects')
+
+    async def request(self, method, url):
+        """Send one request and return (status, Location header or None)."""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f'not an http(s) URL: {url}')
+        secure = parts.scheme == 'https'
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or (443 if secure else 80),
+            ssl=self.ssl_context if secure else None)
+        try:
+            target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+            writer.write((f'{method} {target} HTTP/1.1\r\n'
+                          f'Host: {parts.netloc.rpartition("@")[2]}\r\n'
+                          f'User-Agent: {LINK_USER_AGENT}\r\n'
+                          'Accept: */*\r\nConnection: close\r\n\r\n').encode('ascii'))
+            await writer.drain()
+            fields = (await reader.readline()).split(None, 2)
+            if len(fields) < 2 or not fields[0].startswith(b'HTTP/') or not fields[1].isdigit():
+                raise ValueError('malformed status line')
+            location = None
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.partition(b':')
+                if name.strip().lower() == b'location':
+                    location = value.strip().decode('latin-1')
+            return int(fields[1]), location
+        finally:
+            writer.close()
+
+
+class LinkHealth:
+    """Latest check result per URL plus the derived set of broken links.
+
+    `state` is (generation, broken URLs, time the set last changed), replaced
+    as one tuple so readers never see a mismatched pair. The generation is a
+    hash of the broken set: identical in every worker that has the same
+    results, and empty while nothing is broken.
+    """
+
+    def __init__(self, path, broken_after):
+        self.path = path
+        self.broken_after = broken_after
+        self.results = {}
+        self.state = ('', frozenset(), 0.0)
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def stale(self, urls, ttl, now):
+        """URLs never checked, older than ttl, or failing (retried every round)."""
+        out = []
+        for url in urls:
+            result = self.results.get(url)
+            if result is None or result['failures'] or now - result['checked'] > ttl:
+                out.append(url)
+        return out
+
+    def record(self, outcomes, now):
+        with self._lock:
+            for url, (status, error) in outcomes.items():
+                previous = self.results.get(url, {'failures': 0, 'changed': 0.0})
+                failures = previous['failures'] + 1 if link_failed(status, error) else 0
+                changed = previous['changed']
+                if (failures >= self.broken_after) != (previous['failures'] >= self.broken_after):
+                    changed = now
+                self.results[url] = {'status': status, 'error': error, 'checked': now,
+                                     'failures': failures, 'changed': changed}
+            self._update_state()
+
+    def _update_state(self):
+        broken = frozenset(url for url, r in self.results.items() if r['failures'] >= self.broken_after)
+        if broken != self.state[1]:
+            generation = hashlib.blake2b('\n'.join(sorted(broken)).encode(), digest_size=4).hexdigest() if broken else ''
+            changed = max((r['changed'] for r in self.results.values()), default=0.0)
+            self.state = (generation, broken, changed)
+
+    def load(self):
+        """Merge results other workers saved, keeping the newer check per URL."""
+        try:
+            st = os.stat(self.path)
+            if (st.st_mtime_ns, st.st_size) == self._signature:
+                return
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            self._signature = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return
+        except ValueError:  # torn or hand-edited file; it is rewritten on save
+            return
+        with self._lock:
+            for url, result in saved.items():
+                if url not in self.results or result['checked'] > self.results[url]['checked']:
+                    self.results[url] = result
+            self._update_state()
+
+    def save(self):
+        self.load()
+        with self._lock:
+            payload = json.dumps(self.results, indent=1, sort_keys=True)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp, self.path)
+
+
+class LinkWatcher(threading.Thread):
+    """Re-checks stale links every LINK_CHECK_INTERVAL seconds.
+
+    Runs in every worker, but only the elected one checks; the rest just
+    reload the results it saves.
+    """
+
+    def __init__(self, health, urls, config):
+        super().__init__(name='link-watcher', daemon=True)
+        self.health = health
+        self.urls = urls
+        self.config = config
+        self._lock_file = None
+
+    def elected(self):
+        """Whether this process checks links.
+
+        The lock is held until the process exits, when the OS releases it
+        and the next worker to try takes over.
+        """
+        if self._lock_file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.health.path)), exist_ok=True)
+            self._lock_file = open(self.health.path + '.lock', 'a')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def run(self):
+        cfg = self.config
+        checker = LinkChecker(cfg['LINK_CHECK_TIMEOUT'], cfg['LINK_CHECK_CONCURRENCY'],
+                              cfg['LINK_CHECK_PER_HOST'], cfg['LINK_CHECK_REDIRECTS'])
+        while True:
+            try:
+                self.health.load()
+                todo = self.elected() and self.health.stale(self.urls(), cfg['LINK_CHECK_TTL'], time.time())
+                if todo:
+                    outcomes = asyncio.run(checker.check_all(todo))
+                    # Not one HTTP response: more likely our network than every site.
+                    if all(status is None for status, _ in outcomes.values()):
+                        app.logger.warning('link check: no host answered, ignoring this round')
+                    else:
+                        self.health.record(outcomes, time.time())
+                        self.health.save()
+            except Exception:
+                app.logger.exception('link check failed')
+            time.sleep(cfg['LINK_CHECK_INTERVAL'])
+
+
+LINK_HEALTH = LinkHealth(app.config['LINK_HEALTH_PATH'], app.config['LINK_BROKEN_AFTER'])
+_link_watcher = {'pid': None}
+_link_watcher_lock = threading.Lock()
+
+
+@app.before_request
+def _start_link_watcher():
+    if app.config['LINK_CHECK_INTERVAL'] and _link_watcher['pid'] != os.getpid():
+        with _link_watcher_lock:
+            if _link_watcher['pid'] != os.getpid():
+                LinkWatcher(LINK_HEALTH, served_links, app.config).start()
+                _link_watcher['pid'] = os.getpid()
+
+
+def served_links():
+    """content_links() of every tenant's current content."""
+    return sorted({url for store in content_stores() if store.current
+                   for url in content_links(store.current.data)})
+
+
+def link_state():
+    """(generation, broken URLs, changed) serving this request, bound like content()."""
+    if has_request_context():
+        state = g.get('link_state')
+        if state is None:
+            state = g.link_state = LINK_HEALTH.state
+        return state
+    return LINK_HEALTH.state
+
+
+@app.template_global()
+def link_broken(url):
+    return url in link_state()[1]
+
+# ---------------------------
+# Rendered-page cache
+# ---------------------------
+# Pages that depend only on content are rendered once per snapshot version
+# and served from memory afterwards, in one LRU shared by every tenant and
+# bounded by PAGE_CACHE_BYTES. The version covers the content, the template
+# and asset sources and the referenced images, so changing any of them
+# invalidates the tenant's cached pages.
+app.config.setdefault('PAGE_CACHE_SIZE', int(os.environ.get('PAGE_CACHE_SIZE', 65536)))  # backstop; bytes bind first
+app.config.setdefault('PAGE_CACHE_BYTES', int(os.environ.get('PAGE_CACHE_BYTES', 64 << 20)))  # shared by all tenants
+app.config.setdefault('PROJECTS_PER_PAGE', 12)
+app.config.setdefault('STREAM_PAGES', os.environ.get('STREAM_PAGES') == '1')  # opt-in, see stream_page()
+app.config.setdefault('STREAM_CHUNK_SIZE', 16 * 1024)
+
+
+def data_version():
+    """Return (version, Last-Modified timestamp) of the pages serving this request.
+
+    That is the content snapshot plus, once any link is broken, the link-health
+    generation, since templates hide broken links.
+    """
+    snapshot = content()
+    generation, _, changed = link_state()
+    if not generation:
+        return snapshot.version, snapshot.modified
+    return f'{snapshot.version}.{generation}', max(snapshot.modified, changed)
+
+
+def cached_size(value):
+    """Approximate memory held by a cached body (or tuple of them), in bytes."""
+    if isinstance(value, tuple):
+        return sum(map(sys.getsizeof, value))
+    return sys.getsizeof(value)
+
+
+class PageCache:
+    """Thread-safe LRU of rendered bodies, bounded by entry count and optionally bytes.
+
+    With by_tenant the keys are (tenant, version, route): lookups, entries
+    and bytes are tallied per tenant and drop() forgets one tenant.
+    """
+
+    def __init__(self, max_entries, name='page', max_bytes=None, by_tenant=False):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        self.by_tenant = by_tenant
+        self.bytes = 0
+        self._sized = bool(max_bytes or by_tenant)
+        self._entries = OrderedDict()  # key -> (body, size)
+        self._tenants = {}  # tenant -> [hits, misses, entries, bytes]
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            if self.by_tenant:
+                self._tenant(key[0])[0 if entry is not None else 1] += 1
+        if self.name:
+            record_cache(self.name, entry is not None)
+        if entry is not None:
+            return entry[0]
+        # Render outside the lock; two threads racing on a cold key both
+        # render, which is cheaper than serialising every miss.
+        body = render()
+        with self._lock:
+            self._store([(key, body)])
+        return body
+
+    def _tenant(self, tenant):
+        stats = self._tenants.get(tenant)
+        if stats is None:
+            stats = self._tenants[tenant] = [0, 0, 0, 0]
+        return stats
+
+    def _account(self, key, size, count):
+        self.bytes += size
+        if self.by_tenant:
+            stats = self._tenant(key[0])
+            stats[2] += count
+            stats[3] += size
+
+    def _store(self, items):
+        # Caller holds the lock.
+        for key, body in items:
+            size = cached_size(body) if self._sized else 0
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._account(key, -previous[1], -1)
+            self._entries[key] = (body, size)
+            self._account(key, size, 1)
+        while len(self._entries) > self.max_entries or (
+                self.max_bytes and self.bytes > self.max_bytes and len(self._entries) > 1):
+            key, (_, size) = self._entries.popitem(last=False)
+            self._account(key, -size, -1)
+
+    def drop(self, tenant):
+        """Forget every entry of one tenant, e.g. after its content changed."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == tenant]:
+                self._account(key, -self._entries.pop(key)[1], -1)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            for stats in self._tenants.values():
+                stats[2] = stats[3] = 0
+
+    def items(self):
+        with self._lock:
+            return [(key, body) for key, (body, _) in self._entries.items()]
+
+    def update(self, items):
+        with self._lock:
+            self._store(items)
+
+    def tenant_stats(self):
+        """{tenant: {'hits', 'misses', 'entries', 'bytes'}} for this process."""
+        with self._lock:
+            return {tenant: dict(zip(('hits', 'misses', 'entries', 'bytes'), stats))
+                    for tenant, stats in self._tenants.items()}
+
+
+PAGE_CACHE = PageCache(app.config['PAGE_CACHE_SIZE'], max_bytes=app.config['PAGE_CACHE_BYTES'], by_tenant=True)
+
+
+def derived(name, build):
+    """Return build() memoised for the content snapshot serving this request.
+
+    Use it for indexes and other structures derived from content so they are
+    built exactly once per version.
+    """
+    return content().derived(name, build)
+
+
+def project_index():
+    return content().project_index
+
+
+def page_window(page, pages, radius=2):
+    """Page numbers for the pager: first, last and `radius` either side of page.
+
+    Gaps are None (rendered as an ellipsis), so the pager stays the same
+    size however many pages there are.
+    """
+    shown = sorted({1, pages} | set(range(max(1, page - radius), min(pages, page + radius) + 1)))
+    window = []
+    for n in shown:
+        if window and n - window[-1] == 2:
+            window.append(n - 1)  # a gap of one page is shown, not elided
+        elif window and n - window[-1] > 2:
+            window.append(None)
+        window.append(n)
+    return window
+
+
+def paginate(items, page, per_page):
+    """Slice items (in their stored order) into page `page`, or None if out of range."""
+    pages = max(1, -(-len(items) // per_page))
+    if not 1 <= page <= pages:
+        return None
+    start = (page - 1) * per_page
+    return {
+        'items': items[start:start + per_page],
+        'page': page,
+        'pages': pages,
+        'total': len(items),
+        'prev': page - 1 if page > 1 else None,
+        'next': page + 1 if page < pages else None,
+        'window': page_window(page, pages),
+    }
+
+
+
+def stream_page(template_name, **context):
+    """Render a template as a stream of chunks instead of one string.
+
+    The first chunk (BASE_HTML up to </head>: the CSS and CDN links) is sent
+    as soon as it is produced; after that output is grouped into
+    STREAM_CHUNK_SIZE pieces. Time-to-first-byte no longer grows
+    with the size of the content and only one chunk is held in memory at a time.
+    """
+    app.update_template_context(context)
+    template = app.jinja_env.get_template(template_name)
+    chunk_size = app.config['STREAM_CHUNK_SIZE']
+
+    def generate():
+        buffered, size, head_sent = [], 0, False
+        for part in template.generate(context):
+            buffered.append(part)
+            size += len(part)
+            if size >= chunk_size or (not head_sent and '</head>' in part):
+                head_sent = True
+                yield ''.join(buffered)
+                buffered, size = [], 0
+        if buffered:
+            yield ''.join(buffered)
+
+    return stream_with_context(generate())
+
+
+def cached_page(key, template_name, **context):
+    """Serve a content-driven page with strong ETag/Last-Modified validators.
+
+    Conditional requests are answered with 304 before anything is rendered.
+    Otherwise the page comes from PAGE_CACHE (compacted once, at render time),
+    or is streamed uncached when STREAM_PAGES is on. Streamed chunks are not
+    compacted since a chunk boundary may fall inside a <textarea>; the
+    validators only depend on the content version, so they are still sent.
+    """
+    version, since = data_version()
+    etag = hashlib.blake2b(f'{version}:{key}'.encode(), digest_size=16).hexdigest()
+    last_modified = datetime.fromtimestamp(int(since), tz=timezone.utc)
+
+    if request.if_none_match:
+        # If-None-Match uses weak comparison: a W/ tag (e.g. from a proxy that
+        # re-encoded the body) still matches the page it came from.
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = (request.if_modified_since is not None
+                        and request.if_modified_since >= last_modified)
+
+    if not_modified:
+        response = app.response_class(status=304)
+    elif app.config['STREAM_PAGES']:
+        response = app.response_class(stream_page(template_name, **context), mimetype='text/html')
+    else:
+        body = PAGE_CACHE.get_or_render(
+            (content().tenant, version, key), lambda: render_page(template_name, **context))
+        response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+# ---------------------------
+# Fragment cache
+# ---------------------------
+# {% cache %} blocks (FragmentCacheExtension) render each project card,
+# experience entry and certification once per content digest. A content
+# swap clears PAGE_CACHE but not FRAGMENT_CACHE, so re-rendering the index
+# after one edit renders only the changed cards and stitches in the rest.
+from collections.abc import Mapping
+
+app.config.setdefault('FRAGMENT_CACHE_SIZE', 20000)  # 0 disables fragment caching
+
+FRAGMENT_CACHE = PageCache(app.config['FRAGMENT_CACHE_SIZE'], name=None)  # lookups tallied below
+FRAGMENT_COLLECTIONS = ('projects', 'experience', 'certifications', 'education')
+
+
+def content_digest(item):
+    # repr() of a frozen item is deterministic and far cheaper than JSON.
+    return hashlib.blake2b(repr(item).encode(), digest_size=12).hexdigest()
+
+
+def fragment_state():
+    """(item digests, key salt, [hits, misses]) for the current request.
+
+    Digests are computed once per snapshot. The salt covers what a fragment
+    may depend on besides its items: image stamps and the broken-link set.
+    """
+    state = g.get('fragment_state')
+    if state is None:
+        snapshot = content()
+        digests = snapshot.derived('item_digests', lambda: {
+            id(item): content_digest(item) for name in FRAGMENT_COLLECTIONS for item in snapshot.data[name]})
+        stamp = snapshot.derived('stamp_digest', lambda: content_digest(snapshot.stamp))
+        tally = cache_tally('fragment') if app.config['METRICS_ENABLED'] else [0, 0]
+        state = g.fragment_state = (digests, (stamp, link_state()[0]), tally)
+    return state
+
+
+def fragment_cache(parts, render):
+    if not app.config['FRAGMENT_CACHE_SIZE']:
+        return render()
+    digests, salt, tally = fragment_state()
+    key = salt + tuple((digests.get(id(part)) or content_digest(part)) if isinstance(part, Mapping) else part
+                       for part in parts)
+
+    def miss():
+        tally[0] -= 1
+        tally[1] += 1
+        return render()
+
+    tally[0] += 1
+    return FRAGMENT_CACHE.get_or_render(key, miss)
+
+# ---------------------------
+# Contact outbox
+# ---------------------------
+# contact() only appends the message to a local SQLite outbox (WAL mode, no
+# fsync per commit), so a POST never waits on the mail server. A background
+# thread per worker process claims pending rows in batches and delivers them
+# over one reused SMTP connection, retrying failures with exponential
+# backoff. Claims are leases, so rows held by a worker that died are picked
+# up again later: delivery is at-least-once.
+import random
+import smtplib
+import sqlite3
+from email.message import EmailMessage
+
+app.config.setdefault('OUTBOX_PATH', os.environ.get(
+    'OUTBOX_PATH', os.path.join(app.instance_path, 'outbox.sqlite3')))
+app.config.setdefault('SMTP_HOST', os.environ.get('SMTP_HOST', ''))  # empty: store only, never deliver
+app.config.setdefault('SMTP_PORT', int(os.environ.get('SMTP_PORT', 587)))
+app.config.setdefault('SMTP_USER', os.environ.get('SMTP_USER', ''))
+app.config.setdefault('SMTP_PASSWORD', os.environ.get('SMTP_PASSWORD', ''))
+app.config.setdefault('SMTP_STARTTLS', os.environ.get('SMTP_STARTTLS', '1') == '1')
+app.config.setdefault('SMTP_TIMEOUT', 10.0)
+app.config.setdefault('CONTACT_TO', os.environ.get('CONTACT_TO', ''))  # empty: the content's email
+app.config.setdefault('CONTACT_FROM', os.environ.get('CONTACT_FROM', 'portfolio@localhost'))
+app.config.setdefault('OUTBOX_BATCH_SIZE', 20)
+app.config.setdefault('OUTBOX_POLL_INTERVAL', 5.0)
+app.config.setdefault('OUTBOX_MAX_ATTEMPTS', 8)
+app.config.setdefault('OUTBOX_BACKOFF', (5.0, 3600.0))  # first retry delay, cap (seconds)
+app.config.setdefault('OUTBOX_LEASE', 120.0)
+
+_OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    recipient TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt);
+"""
+
+
+class Outbox:
+    """SQLite-backed queue of contact messages shared by all worker processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self):
+        # sqlite3 connections are per thread; each thread opens its own.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_OUTBOX_SCHEMA)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(outbox)')}
+            if 'recipient' not in columns:  # outbox created before multi-tenant hosting
+                try:
+                    conn.execute("ALTER TABLE outbox ADD COLUMN recipient TEXT NOT NULL DEFAULT ''")
+                except sqlite3.OperationalError:
+                    pass  # another worker added it first
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, name, email, message, recipient=''):
+        cur = self.connection().execute(
+            'INSERT INTO outbox (created, name, email, message, recipient) VALUES (?, ?, ?, ?, ?)',
+            (time.time(), name, email, message, recipient))
+        return cur.lastrowid
+
+    def claim(self, limit, lease):
+        """Lease up to `limit` due messages to the caller and return them."""
+        conn = self.connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                "SELECT id, name, email, message, attempts, recipient FROM outbox "
+                "WHERE status = 'pending' AND next_attempt <= ? AND claimed_until <= ? "
+                "ORDER BY id LIMIT ?", (now, now, limit)).fetchall()
+            conn.executemany('UPDATE outbox SET claimed_until = ? WHERE id = ?',
+                             [(now + lease, row[0]) for row in rows])
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return rows
+
+    def release(self, msg_ids):
+        self.connection().executemany('UPDATE outbox SET claimed_until = 0 WHERE id = ?',
+                                      [(msg_id,) for msg_id in msg_ids])
+
+    def mark_sent(self, msg_id):
+        self.connection().execute(
+            "UPDATE outbox SET status = 'sent', claimed_until = 0, last_error = NULL WHERE id = ?",
+            (msg_id,))
+
+    def mark_failed(self, msg_id, attempts, error, max_attempts, backoff):
+        first, cap = backoff
+        delay = min(cap, first * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+        status = 'failed' if attempts >= max_attempts else 'pending'
+        self.connection().execute(
+            "UPDATE outbox SET status = ?, attempts = ?, next_attempt = ?, claimed_until = 0, "
+            "last_error = ? WHERE id = ?",
+            (status, attempts, time.time() + delay, str(error)[:500], msg_id))
+
+    def counts(self):
+        return dict(self.connection().execute('SELECT status, COUNT(*) FROM outbox GROUP BY status'))
+
+
+class SMTPConnection:
+    """One lazily opened SMTP session reused across deliveries."""
+
+    def __init__(self, config):
+        self.config = config
+        self._smtp = None
+
+    def send(self, msg):
+        if self._smtp is None:
+            cfg = self.config
+            smtp = smtplib.SMTP(cfg['SMTP_HOST'], cfg['SMTP_PORT'], timeout=cfg['SMTP_TIMEOUT'])
+            if cfg['SMTP_STARTTLS'] and smtp.has_extn('starttls'):
+                smtp.starttls()
+            if cfg['SMTP_USER']:
+                smtp.login(cfg['SMTP_USER'], cfg['SMTP_PASSWORD'])
+            self._smtp = smtp
+        try:
+            self._smtp.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # Dropped connection: discard it so the next attempt reconnects.
+            self.close()
+            raise
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+def header_text(value):
+    """value on one line: CR/LF in a header would make EmailMessage raise."""
+    return ' '.join(value.split())
+
+
+def build_contact_email(name, email, message, config, recipient=''):
+    msg = EmailMessage()
+    msg['Subject'] = f'Portfolio contact from {header_text(name)}'
+    msg['From'] = config['CONTACT_FROM']
+    msg['To'] = recipient or config['CONTACT_TO'] or content().data['email']
+    if '@' in email:
+        msg['Reply-To'] = header_text(email)
+    msg.set_content(f'From: {name} <{email}>\n\n{message}')
+    return msg
+
+
+class DeliveryWorker(threading.Thread):
+    """Background thread draining the outbox into SMTP."""
+
+    def __init__(self, outbox, config):
+        super().__init__(name='outbox-delivery', daemon=True)
+        self.outbox = outbox
+        self.config = config
+        self.wakeup = threading.Event()
+        self.smtp = SMTPConnection(config)
+
+    def run(self):
+        cfg = self.config
+        while True:
+            self.wakeup.wait(cfg['OUTBOX_POLL_INTERVAL'])
+            self.wakeup.clear()
+            try:
+                self.drain()
+            except Exception:
+                app.logger.exception('outbox delivery loop failed')
+            self.smtp.close()  # don't hold an idle session between batches
+
+    def drain(self):
+        cfg = self.config
+        while True:
+            batch = self.outbox.claim(cfg['OUTBOX_BATCH_SIZE'], cfg['OUTBOX_LEASE'])
+            for i, (msg_id, name, email, message, attempts, recipient) in enumerate(batch):
+                try:
+                    msg = build_contact_email(name, email, message, cfg, recipient)
+                except Exception as exc:
+                    # Retrying can't fix the message itself; fail it now so it
+                    # doesn't sit at the head of every claim.
+                    app.logger.error('outbox message %s is undeliverable: %s', msg_id, exc)
+                    self.outbox.mark_failed(msg_id, cfg['OUTBOX_MAX_ATTEMPTS'], exc,
+                                            cfg['OUTBOX_MAX_ATTEMPTS'], cfg['OUTBOX_BACKOFF'])
+                    continue
+                try:
+                    self.smtp.send(msg)
+                except Exception as exc:
+                    app.logger.warning('outbox message %s failed: %s', msg_id, exc)
+                    self.outbox.mark_failed(msg_id, attempts + 1, exc,
+                                            cfg['OUTBOX_MAX_ATTEMPTS'], cfg['OUTBOX_BACKOFF'])
+                    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError)):
+                        # The server is unreachable; give the rest of the batch
+                        # back instead of timing out on each message in turn.
+                        self.outbox.release([row[0] for row in batch[i + 1:]])
+                        return
+                else:
+                    self.outbox.mark_sent(msg_id)
+            if len(batch) < cfg['OUTBOX_BATCH_SIZE']:
+                return
+
+
+OUTBOX = Outbox(app.config['OUTBOX_PATH'])
+_delivery = {'pid': None, 'worker': None}
+_delivery_lock = threading.Lock()
+
+
+def delivery_worker():
+    """This process's delivery thread, started on first use after fork."""
+    if not app.config['SMTP_HOST']:
+        return None
+    if _delivery['pid'] != os.getpid():
+        with _delivery_lock:
+            if _delivery['pid'] != os.getpid():
+                worker = DeliveryWorker(OUTBOX, app.config)
+                worker.start()
+                _delivery['pid'], _delivery['worker'] = os.getpid(), worker
+    return _delivery['worker']
+
+
+@app.before_request
+def _start_delivery():
+    # Also picks up messages left pending by a previous process.
+    delivery_worker()
+
+
+def queue_contact(name, email, message):
+    """Durably store a contact message and nudge the delivery thread.
+
+    Messages sent to a tenant's site go to that tenant's email address.
+    """
+    snapshot = content()
+    msg_id = OUTBOX.enqueue(name, email, message, snapshot.data['email'] if snapshot.tenant else '')
+    worker = delivery_worker()
+    if worker is not None:
+        worker.wakeup.set()
+    return msg_id
+
+# ---------------------------
+# Stack facets
+# ---------------------------
+# /projects?stack=Firebase&stack=ESP8266 keeps the projects using every listed
+# technology (or any of them with match=any). Each technology maps to an int
+# whose bit i is set when projects[i] lists it, so a filter is a few bitwise
+# ANDs/ORs and a facet count is a popcount, whatever the number of projects.
+from functools import reduce
+import operator
+
+
+class FacetIndex:
+    """Technology -> bitset of project positions, for one content snapshot.
+
+    Names are matched case-insensitively and shown as first written.
+    """
+
+    def __init__(self, projects):
+        self.projects = projects
+        self.all = (1 << len(projects)) - 1
+        self.labels = {}
+        masks = {}
+        for position, proj in enumerate(projects):
+            for name in proj['stack']:
+                key = name.casefold()
+                self.labels.setdefault(key, name)
+                mask = masks.get(key)
+                if mask is None:
+                    mask = masks[key] = bytearray(len(projects) // 8 + 1)
+                mask[position >> 3] |= 1 << (position & 7)
+        self.bits = {key: int.from_bytes(mask, 'little') for key, mask in masks.items()}
+
+    def canonical(self, names):
+        """Sorted, de-duplicated display names for a list of requested names.
+
+        Names no project uses are dropped, so they can't mint cache keys.
+        """
+        keys = {name.strip().casefold() for name in names} & self.labels.keys()
+        return sorted((self.labels[key] for key in keys), key=str.casefold)
+
+    def unknown(self, names):
+        """Whether any requested name is one no project uses."""
+        return any(name.strip() and name.strip().casefold() not in self.labels for name in names)
+
+    def select(self, names, match_any=False):
+        if not names:
+            return self.all
+        return reduce(operator.or_ if match_any else operator.and_,
+                      (self.bits.get(name.casefold(), 0) for name in names))
+
+    def items(self, selection):
+        """The projects whose bits are set in selection, in stored order."""
+        if selection == self.all:
+            return self.projects
+        projects = self.projects
+        return [projects[i] for i, bit in enumerate(reversed(f'{selection:b}')) if bit == '1']
+
+    def counts(self, within):
+        """[(name, number of projects in `within` using it)], most used first."""
+        counts = ((label, (self.bits[key] & within).bit_count()) for key, label in self.labels.items())
+        return sorted(counts, key=lambda pair: (-pair[1], pair[0].casefold()))
+
+
+def facet_index():
+    return derived('facets', lambda: FacetIndex(content().data['projects']))
+
+
+def facet_links(facets, selected, match):
+    """Facet badges for the template, each linking to the filter with it toggled."""
+    chosen = {name.casefold() for name in selected}
+    # With match=all a count says how many of the current results remain if
+    # the facet is added; with match=any it is the facet's overall size.
+    within = facets.all if match == 'any' else facets.select(selected)
+    links = []
+    for name, count in facets.counts(within):
+        on = name.casefold() in chosen
+        if not count and not on:
+            continue
+        stacks = [s for s in selected if s.casefold() != name.casefold()] if on else selected + [name]
+        links.append({'name': name, 'count': count, 'selected': on,
+                      'url': url_for('projects', stack=stacks, match='any' if match == 'any' and stacks else None)})
+    return links
 
 # ---------------------------
 # Routes
 # ---------------------------
 @app.route('/')
 def index():
-    return render_template_string(app.jinja_loader.get_source(app.jinja_env, 'index.html')[0], data=DATA)
+    data = content().data
+    page = paginate(data['projects'], 1, app.config['PROJECTS_PER_PAGE'])
+    return cached_page('index', 'index.html', data=data, projects_page=page)
+
+@app.route('/projects')
+def projects():
+    data = content().data
+    facets = facet_index()
+    requested = request.args.getlist('stack')
+    selected = facets.canonical(requested)
+    match = 'any' if request.args.get('match') == 'any' and selected else 'all'
+    if match == 'all' and facets.unknown(requested):
+        items = []  # no project uses every one of them
+    else:
+        items = facets.items(facets.select(selected, match == 'any'))
+    page = paginate(items, request.args.get('page', 1, type=int), app.config['PROJECTS_PER_PAGE'])
+    if page is None:
+        abort(404)
+    page['args'] = {'stack': selected, 'match': 'any' if match == 'any' else None}
+    context = dict(data=data, projects_page=page, selected=selected, match=match,
+                   facets=facet_links(facets, selected, match),
+                   match_url=url_for('projects', stack=selected, match=None if match == 'any' else 'any'))
+    if not items:
+        # Combinations nothing matches are cheap to render and not worth a cache slot.
+        return render_page('projects.html', **context)
+    key = f"projects/{page['page']}"
+    if selected:
+        key = f"projects/{match}/{'/'.join(s.casefold() for s in selected)}/{page['page']}"
+    return cached_page(key, 'projects.html', **context)
 
 @app.route('/project/<pid>')
 def project(pid):
-    proj = next((p for p in DATA['projects'] if p['id'] == pid), None)
+    proj = project_index().get(pid)
     if not proj:
         return redirect(url_for('index'))
-    return render_template_string(app.jinja_loader.get_source(app.jinja_env, 'project.html')[0], data=DATA, project=proj)
+    return cached_page(f'project/{pid}', 'project.html', data=content().data, project=proj)
 
 @app.route('/contact', methods=['POST'])
 def contact():
     name = request.form.get('name', 'Friend')
     email = request.form.get('email', 'unknown')
     message = request.form.get('message', '')
-    # Demo behaviour: show thank you page. Replace with real email sending if required.
-    return render_template_string(app.jinja_loader.get_source(app.jinja_env, 'thankyou.html')[0], data=DATA, name=name, email=email)
+    queue_contact(name, email, message)
+    return render_page('thankyou.html', data=content().data, name=name, email=email)
+
+# ---------------------------
+# JSON API
+# ---------------------------
+# /api/projects, /api/projects/<id>, /api/experience and /api/certifications
+# expose the same content the templates render. Bodies are serialised once
+# per (snapshot version, query) and kept with their strong ETag, so repeat
+# requests cost a cache lookup and usually end in a 304.
+app.config.setdefault('API_CACHE_SIZE', 512)
+app.config.setdefault('API_PER_PAGE', 50)
+app.config.setdefault('API_MAX_PER_PAGE', 200)
+
+API_COLLECTIONS = ('projects', 'experience', 'certifications')
+API_CACHE = PageCache(app.config['API_CACHE_SIZE'], name='api', by_tenant=True)
+
+
+def dumps(value):
+    """Serialise (possibly frozen) content to JSON bytes, with orjson if available."""
+    if orjson is not None:
+        return orjson.dumps(value, default=dict)
+    return json.dumps(value, default=dict, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def api_error(status, message):
+    return app.response_class(dumps({'error': message}), status=status, mimetype='application/json')
+
+
+def api_fields(collection):
+    """Sorted tuple of the requested ?fields=, None for all; raises ValueError on unknown names."""
+    raw = request.args.get('fields', '')
+    fields = tuple(sorted({name.strip() for name in raw.split(',') if name.strip()}))
+    unknown = set(fields) - set(CONTENT_SCHEMA[collection][0])
+    if unknown:
+        raise ValueError(f"unknown field(s) for {collection}: {', '.join(sorted(unknown))}")
+    return fields or None
+
+
+def select_fields(item, fields):
+    return {name: item[name] for name in fields} if fields else item
+
+
+def api_response(key, build):
+    snapshot = content()
+
+    def serialise():
+        body = dumps(build())
+        return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    body, etag = API_CACHE.get_or_render((snapshot.tenant, snapshot.version, key), serialise)
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.last_modified = datetime.fromtimestamp(int(snapshot.modified), tz=timezone.utc)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response.make_conditional(request)
+
+
+@app.route('/api/<any(projects, experience, certifications):collection>')
+def api_collection(collection):
+    try:
+        fields = api_fields(collection)
+    except ValueError as exc:
+        return api_error(400, str(exc))
+    per_page = min(max(1, request.args.get('per_page', app.config['API_PER_PAGE'], type=int)),
+                   app.config['API_MAX_PER_PAGE'])
+    items = content().data[collection]
+    page = paginate(items, request.args.get('page', 1, type=int), per_page)
+    if page is None:
+        return api_error(404, 'page out of range')
+
+    def build():
+        return {
+            'items': [select_fields(item, fields) for item in page['items']],
+            'page': page['page'],
+            'per_page': per_page,
+            'pages': page['pages'],
+            'total': page['total'],
+            'next': url_for('api_collection', collection=collection, page=page['next'],
+                            per_page=per_page, fields=','.join(fields) if fields else None)
+                    if page['next'] else None,
+        }
+
+    return api_response((collection, fields, page['page'], per_page), build)
+
+
+@app.route('/api/projects/<pid>')
+def api_project(pid):
+    try:
+        fields = api_fields('projects')
+    except ValueError as exc:
+        return api_error(400, str(exc))
+    proj = project_index().get(pid)
+    if proj is None:
+        return api_error(404, f'no project {pid!r}')
+    return api_response(('project', pid, fields), lambda: select_fields(proj, fields))
+
+# ---------------------------
+# Search
+# ---------------------------
+# /search?q= ranks projects, experience and certifications with BM25 over an
+# inverted index built once per content snapshot. Every query token also
+# matches vocabulary terms it is a prefix of (found by bisecting the sorted
+# vocabulary), at a lower weight than an exact hit, so "kube" finds
+# "kubernetes" while typing.
+from array import array
+from operator import itemgetter
+import bisect
+import heapq
+import math
+
+app.config.setdefault('SEARCH_LIMIT', 20)
+app.config.setdefault('SEARCH_MAX_LIMIT', 100)
+
+# Indexed text per collection; the number is the term-frequency weight, so a
+# hit in a project name counts for more than one in its summary.
+SEARCH_FIELDS = {
+    'projects': {'name': 3, 'stack': 2, 'summary': 1, 'contribution': 1},
+    'experience': {'technologies': 2, 'details': 1, 'tasks': 1},
+    'certifications': {'name': 3},
+}
+SEARCH_BM25 = (1.2, 0.75)        # k1, b
+SEARCH_CHAMPIONS = 1000          # postings kept per term, best impact first
+SEARCH_PREFIX_CHAMPIONS = 64     # of those, how many a prefix expansion reads
+SEARCH_PREFIX_WEIGHT = 0.5       # score multiplier for prefix (not exact) matches
+SEARCH_MIN_PREFIX = 2            # shorter tokens only match exactly
+SEARCH_MAX_EXPANSIONS = 32       # vocabulary terms a single prefix may expand to
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return _WORD.findall(text.lower())
+
+
+class SearchIndex:
+    """BM25 inverted index over the content collections listed in SEARCH_FIELDS.
+
+    Postings are stored per term as two parallel arrays, document numbers and
+    precomputed BM25 impacts (idf times the saturated term frequency), sorted
+    by impact and cut to the SEARCH_CHAMPIONS best. A query therefore only sums
+    floats over a bounded number of postings, and a one-word query is a slice.
+    Documents outside every champion list of a query can't rank; with a
+    portfolio-sized corpus the lists are never cut at all.
+
+    Documents are (collection, position) pairs, resolved against the snapshot
+    data only for the results returned.
+    """
+
+    def __init__(self, data):
+        k1, b = SEARCH_BM25
+        self.data = data
+        self.collections = tuple(SEARCH_FIELDS)
+        self.doc_collection = array('B')
+        self.doc_position = array('I')
+        lengths = array('I')
+        raw = {}                                  # term -> (doc numbers, weighted tf)
+        for code, (collection, fields) in enumerate(SEARCH_FIELDS.items()):
+            for position, item in enumerate(data[collection]):
+                doc = len(lengths)
+                counts, length = {}, 0
+                for field, weight in fields.items():
+                    value = item[field]
+                    for token in tokenize(value if isinstance(value, str) else ' '.join(value)):
+                        counts[token] = counts.get(token, 0) + weight
+                        length += 1
+                for term, tf in counts.items():
+                    entry = raw.get(term)
+                    if entry is None:
+                        entry = raw[term] = (array('I'), array('H'))
+                    entry[0].append(doc)
+                    entry[1].append(min(tf, 0xFFFF))
+                lengths.append(length)
+                self.doc_collection.append(code)
+                self.doc_position.append(position)
+
+        n = len(lengths)
+        avg = (sum(lengths) / n) if n else 1.0
+        norms = [k1 * (1 - b + b * length / avg) for length in lengths]
+        self.postings = {}
+        for term, (docs, tfs) in raw.items():
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            ranked = sorted(((idf * tf * (k1 + 1) / (tf + norms[doc]), doc) for doc, tf in zip(docs, tfs)),
+                            reverse=True)[:SEARCH_CHAMPIONS]
+            self.postings[term] = (array('I', [doc for _, doc in ranked]),
+                                   array('f', [impact for impact, _ in ranked]))
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self):
+        return len(self.doc_position)
+
+    def expand(self, token):
+        """Yield (term, weight) for the exact term and the terms token is a prefix of."""
+        if token in self.postings:
+            yield token, 1.0
+        if len(token) < SEARCH_MIN_PREFIX:
+            return
+        vocabulary = self.vocabulary
+        i = bisect.bisect_right(vocabulary, token)
+        for term in vocabulary[i:i + SEARCH_MAX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            yield term, SEARCH_PREFIX_WEIGHT
+
+    def search(self, query, limit=20):
+        """Return the limit best matches as result dicts, best first."""
+        lists = []
+        for token in dict.fromkeys(tokenize(query)):
+            for term, weight in self.expand(token):
+                docs, impacts = self.postings[term]
+                if weight != 1.0:
+                    docs, impacts = docs[:SEARCH_PREFIX_CHAMPIONS], impacts[:SEARCH_PREFIX_CHAMPIONS]
+                lists.append((docs, impacts, weight))
+        if len(lists) == 1:                       # already in rank order
+            docs, impacts, weight = lists[0]
+            top = [(doc, impact * weight) for doc, impact in zip(docs[:limit], impacts)]
+        else:
+            scores = {}
+            get = scores.get
+            for docs, impacts, weight in lists:
+                for doc, impact in zip(docs, impacts):
+                    scores[doc] = get(doc, 0.0) + impact * weight
+            top = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        return [self.result(doc, score) for doc, score in top]
+
+    def result(self, doc, score):
+        collection = self.collections[self.doc_collection[doc]]
+        item = self.data[collection][self.doc_position[doc]]
+        if collection == 'projects':
+            title, url, snippet = item['name'], url_for('project', pid=item['id']), item['summary']
+        elif collection == 'experience':
+            title, url, snippet = f"{item['role']} at {item['company']}", url_for('index') + '#experience', item['details']
+        else:
+            title, url, snippet = item['name'], item['credential_url'] or url_for('index') + '#certifications', item['issuer']
+        return {'kind': collection, 'title': title, 'url': url, 'snippet': snippet, 'score': round(score, 4)}
+
+    def footprint(self):
+        """Approximate bytes held by the index structures (not the content)."""
+        size = sys.getsizeof(self.postings) + sys.getsizeof(self.vocabulary)
+        size += sys.getsizeof(self.doc_collection) + sys.getsizeof(self.doc_position)
+        for term, (docs, impacts) in self.postings.items():
+            size += sys.getsizeof(term) + sys.getsizeof(docs) + sys.getsizeof(impacts) + 56  # + the pair
+        return size
+
+
+def search_index():
+    return derived('search_index', lambda: SearchIndex(content().data))
+
+
+def wants_json():
+    if request.args.get('format') == 'json':
+        return True
+    return request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
+
+
+@app.route('/search')
+def search():
+    query = request.args.get('q', '').strip()[:200]
+    limit = min(max(1, request.args.get('limit', app.config['SEARCH_LIMIT'], type=int)),
+                app.config['SEARCH_MAX_LIMIT'])
+    results = search_index().search(query, limit) if query else []
+    if wants_json():
+        return app.response_class(dumps({'query': query, 'results': results}), mimetype='application/json')
+    return render_page('search.html', data=content().data, query=query, results=results)
+
+# ---------------------------
+# Service worker
+# ---------------------------
+# /sw.js precaches the home page, every project page, the fingerprinted
+# assets, the CDN stylesheets/scripts from BASE_HTML and the images the pages
+# show, in a cache named after the content snapshot version. Fingerprinted and
+# version-pinned URLs are then served straight from that cache; pages are
+# served from it too and revalidated in the background (stale-while-
+# revalidate), so repeat visits and offline views don't wait for a worker.
+# The version is baked into the script, so new content means new script
+# bytes: the browser installs the new worker, which drops the old cache once
+# it activates. /precache-manifest.json exposes the same list for tooling.
+app.config.setdefault('SERVICE_WORKER', os.environ.get('SERVICE_WORKER', '1') != '0')  # 0: serve a worker that removes itself
+
+CDN_URLS = re.findall(r'(?:href|src)="(https://[^"]+)"', BASE_HTML)
+
+SERVICE_WORKER_JS = minify_js(r'''
+const CACHE = 'portfolio-' + VERSION;
+const PRECACHED = new Set(PRECACHE);
+// These never change meaning, so there is nothing to revalidate.
+const IMMUTABLE = [/^\/assets\//, /^\/img\/\d+\/[0-9a-f]+\//];
+
+function precache(cache, url) {
+  const request = new Request(url, {mode: url.startsWith('/') ? 'same-origin' : 'no-cors'});
+  return fetch(request).then(function(response) {
+    if (response.ok || response.type === 'opaque') {
+      return cache.put(url, response);
+    }
+  }).catch(function() {});  // one unreachable URL must not fail the install
+}
+
+self.addEventListener('install', function(event) {
+  event.waitUntil(caches.open(CACHE).then(function(cache) {
+    return Promise.all(PRECACHE.map(function(url) { return precache(cache, url); }));
+  }).then(function() { return self.skipWaiting(); }));
+});
+
+self.addEventListener('activate', function(event) {
+  event.waitUntil(caches.keys().then(function(names) {
+    return Promise.all(names.filter(function(name) {
+      return name.startsWith('portfolio-') && name !== CACHE;
+    }).map(function(name) { return caches.delete(name); }));
+  }).then(function() { return self.clients.claim(); }));
+});
+
+self.addEventListener('fetch', function(event) {
+  const request = event.request;
+  if (request.method !== 'GET') {
+    return;
+  }
+  const url = new URL(request.url);
+  const local = url.origin === self.location.origin;
+  const key = local ? url.pathname + url.search : request.url;
+  const pinned = local ? IMMUTABLE.some(function(re) { return re.test(key); }) : PRECACHED.has(key);
+  if (!pinned && !PRECACHED.has(key)) {
+    return;  // search, API, contact, metrics: straight to the network
+  }
+  event.respondWith(caches.open(CACHE).then(function(cache) {
+    return cache.match(request).then(function(cached) {
+      if (cached && pinned) {
+        return cached;
+      }
+      const network = fetch(request).then(function(response) {
+        if (response.ok || response.type === 'opaque') {
+          cache.put(request, response.clone());
+        }
+        return response;
+      });
+      if (cached) {
+        event.waitUntil(network.catch(function() {}));
+        return cached;
+      }
+      return network;
+    });
+  }));
+});
+''')
+
+# Served while SERVICE_WORKER is off: replaces an installed worker, deletes
+# its caches and unregisters, so turning the feature off takes effect.
+SERVICE_WORKER_OFF_JS = minify_js('''
+self.addEventListener('install', function() { self.skipWaiting(); });
+self.addEventListener('activate', function(event) {
+  event.waitUntil(caches.keys().then(function(names) {
+    return Promise.all(names.filter(function(name) {
+      return name.startsWith('portfolio-');
+    }).map(function(name) { return caches.delete(name); }));
+  }).then(function() { return self.registration.unregister(); }));
+});
+''')
+
+
+def precache_manifest():
+    """{'version': snapshot version, 'urls': [...]} for the current content."""
+    snapshot = content()
+
+    def build():
+        data = snapshot.data
+        images = [data['profile_image']] + [p['image'] for p in data['projects']]
+        urls = (export_paths() + CDN_URLS + [asset_url(name) for name in ASSETS]
+                + [(image_sources(src) or {'src': src})['src'] for src in images if src])
+        return {'version': snapshot.version, 'urls': list(dict.fromkeys(urls))}
+
+    return snapshot.derived('precache_manifest', build)
+
+
+def script_response(body, mimetype):
+    """Revalidated on every use: a stale worker script would pin old content."""
+    response = app.response_class(body, mimetype=mimetype)
+    response.set_etag(hashlib.blake2b(response.get_data(), digest_size=16).hexdigest())
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@app.route('/precache-manifest.json')
+def precache_manifest_json():
+    return script_response(dumps(precache_manifest()), 'application/json')
+
+
+@app.route('/sw.js')
+def service_worker():
+    if not app.config['SERVICE_WORKER']:
+        return script_response(SERVICE_WORKER_OFF_JS, 'application/javascript')
+    snapshot = content()
+
+    def build():
+        manifest = precache_manifest()
+        return (f"const VERSION = {json.dumps(manifest['version'])};\n"
+                f"const PRECACHE = {json.dumps(manifest['urls'])};\n" + SERVICE_WORKER_JS)
+
+    return script_response(snapshot.derived('service_worker', build), 'application/javascript')
+
+# ---------------------------
+# Response compression
+# ---------------------------
+# gunicorn doesn't compress, so the app does. Bodies that carry a strong ETag
+# (cached pages, assets) are compressed once per content version and the
+# result is kept in an LRU keyed by (ETag, encoding); everything else is
+# compressed per request. Streamed pages are gzipped chunk by chunk.
+import zlib
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+app.config.setdefault('COMPRESS_CACHE_SIZE', 512)
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+
+
+def _gzip(body):
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+ENCODERS = {}  # preference order for equal q-values
+if brotli is not None:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=5)
+if zstandard is not None:
+    ENCODERS['zstd'] = lambda body: zstandard.ZstdCompressor(level=10).compress(body)
+ENCODERS['gzip'] = _gzip
+
+# Compressed variants get their own strong ETag ("<tag>-gzip"); incoming
+# If-None-Match values are mapped back to the app's tag before dispatch, but
+# only for the encoding this request negotiated, so a client that can't
+# decode gzip never revalidates (and keeps) a gzip body.
+_VARIANT_TAGS = {name: re.compile(f'-{name}"') for name in ENCODERS}
+
+
+class CompressionMiddleware:
+    """WSGI middleware negotiating Accept-Encoding for compressible responses."""
+
+    def __init__(self, wsgi_app, min_size, cache_size):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def negotiate(self, header):
+        accept = parse_accept_header(header)
+        best, best_q = None, 0
+        for name in ENCODERS:
+            if accept[name] > best_q:
+                best, best_q = name, accept[name]
+        return best
+
+    def compress(self, body, encoding, etag):
+        if not etag or etag.startswith('W/'):
+            return ENCODERS[encoding](body)
+        key = (etag, encoding)
+        with self._lock:
+            packed = self._cache.get(key)
+            if packed is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if packed is not None:
+            record_cache('compression', True)
+            return packed
+        record_cache('compression', False)
+        packed = ENCODERS[encoding](body)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = packed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return packed
+
+    def items(self):
+        with self._lock:
+            return list(self._cache.items())
+
+    def update(self, items):
+        with self._lock:
+            self._cache.update(items)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def __call__(self, environ, start_response):
+        encoding = self.negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        variant = None
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and encoding:
+            mapped, count = _VARIANT_TAGS[encoding].subn('"', if_none_match)
+            if count:
+                variant = encoding
+                environ['HTTP_IF_NONE_MATCH'] = mapped
+
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return lambda data: None  # nothing in this app uses write()
+
+        # Werkzeug responses call start_response before returning their
+        # iterable, so status and headers are known here.
+        app_iter = self.wsgi_app(environ, capture)
+        status, header_list, exc_info = captured
+        headers = Headers(header_list)
+        if status.startswith('304'):
+            # 304s carry no Content-Type; hand back the tag the client sent.
+            if variant and headers.get('ETag', '').endswith('"'):
+                headers['ETag'] = headers['ETag'][:-1] + f'-{variant}"'
+                headers.add('Vary', 'Accept-Encoding')
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return app_iter
+        if not headers.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            start_response(status, header_list, exc_info)
+            return app_iter
+        headers.add('Vary', 'Accept-Encoding')
+
+        if (not encoding or not status.startswith('200') or environ['REQUEST_METHOD'] == 'HEAD'
+                or 'Content-Encoding' in headers or 'no-transform' in headers.get('Cache-Control', '')):
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return app_iter
+
+        if 'Content-Length' not in headers:
+            # Only gzip can stream; `in` would ignore an explicit gzip;q=0.
+            if not parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING', ''))['gzip'] > 0:
+                start_response(status, headers.to_wsgi_list(), exc_info)
+                return app_iter
+            headers['Content-Encoding'] = 'gzip'
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return self._gzip_stream(app_iter)
+
+        try:
+            body = b''.join(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+        if len(body) < self.min_size:
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            return [body]
+
+        etag = headers.get('ETag')
+        body = self.compress(body, encoding, etag)
+        headers['Content-Encoding'] = encoding
+        headers['Content-Length'] = str(len(body))
+        if etag and etag.endswith('"'):
+            headers['ETag'] = etag[:-1] + f'-{encoding}"'
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return [body]
+
+    @staticmethod
+    def _gzip_stream(app_iter):
+        # Sync-flush after every chunk so streaming keeps its early first byte.
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        try:
+            for chunk in app_iter:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.flush()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+
+app.wsgi_app = COMPRESSION = CompressionMiddleware(
+    app.wsgi_app, app.config['COMPRESS_MIN_SIZE'], app.config['COMPRESS_CACHE_SIZE'])
+
+# ---------------------------
+# Static export
+# ---------------------------
+# `flask export out/` (or `python app.py --export out/`) pre-renders every
+# content-driven page into plain files with .gz/.br siblings, so a file server
+# or CDN can serve the portfolio and gunicorn only has to handle /contact.
+# `python app.py --serve-export out/`, or EXPORT_DIR=out/ under gunicorn,
+# answers GET/HEAD from those files and falls through to Flask otherwise.
+import click
+from werkzeug.wrappers import Request, Response
+
+EXPORT_ENCODINGS = {'br': '.br', 'gzip': '.gz'}  # preference order
+# Written under their own URL path; every page's site.js registers /sw.js.
+EXPORT_SCRIPTS = ('/sw.js', '/precache-manifest.json')
+
+
+def export_paths():
+    """URL paths of every page that can be exported for the current content."""
+    return ['/'] + [f"/project/{p['id']}" for p in content().data['projects']]
+
+
+def export_file(path):
+    """Relative file name an exported URL path is written to."""
+    return os.path.join(path.strip('/'), 'index.html') if path.strip('/') else 'index.html'
+
+
+def _write_artifacts(target, body):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(body)
+    with open(target + '.gz', 'wb') as f:
+        f.write(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(target + '.br', 'wb') as f:
+            f.write(brotli.compress(body, mode=brotli.MODE_TEXT))
+
+
+def export_site(out_dir):
+    """Render every page into out_dir and return the list of files written."""
+    written = []
+    client = app.test_client()
+    for path in export_paths():
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f'export of {path} failed with HTTP {response.status_code}')
+        target = os.path.join(out_dir, export_file(path))
+        _write_artifacts(target, response.get_data())
+        written.append(target)
+
+    # The thank-you page normally answers POST /contact; export the generic
+    # version so a static form handler can redirect to /thankyou/.
+    with app.test_request_context():
+        body = render_page('thankyou.html', data=content().data, name='Friend', email='unknown').encode()
+    target = os.path.join(out_dir, export_file('/thankyou'))
+    _write_artifacts(target, body)
+    written.append(target)
+
+    for path in EXPORT_SCRIPTS:
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f'export of {path} failed with HTTP {response.status_code}')
+        target = os.path.join(out_dir, path.lstrip('/'))
+        _write_artifacts(target, response.get_data())
+        written.append(target)
+
+    for entry in ASSETS.values():
+        target = os.path.join(out_dir, 'assets', entry['filename'])
+        _write_artifacts(target, entry['body'])
+        written.append(target)
+
+    # Resized variants, at the same query-less URLs the pages reference.
+    data = content().data
+    for src in [data['profile_image']] + [p['image'] for p in data['projects']]:
+        sources = image_sources(src)
+        if not sources:
+            continue
+        source = static_image_path(src)
+        info = image_info(source)
+        for width, url in sources['srcset']:
+            target = safe_join(out_dir, url.lstrip('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(image_variant(source, info, width, url.rpartition('.')[2]), target)
+            written.append(target)
+
+    if os.path.isdir(app.static_folder):
+        shutil.copytree(app.static_folder, os.path.join(out_dir, 'static'), dirs_exist_ok=True)
+    return written
+
+
+class ExportedSite:
+    """WSGI middleware serving pre-rendered pages from an export directory.
+
+    Picks the best precompressed sibling for the client's Accept-Encoding and
+    never touches Jinja; anything it has no file for goes to the wrapped app.
+    """
+
+    def __init__(self, wsgi_app, root):
+        self.wsgi_app = wsgi_app
+        self.root = os.path.abspath(root)
+
+    def __call__(self, environ, start_response):
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self.wsgi_app(environ, start_response)
+        if environ.get('QUERY_STRING'):
+            return self.wsgi_app(environ, start_response)
+        req = Request(environ)
+        is_asset = req.path.startswith(('/assets/', '/img/'))
+        as_is = is_asset or req.path in EXPORT_SCRIPTS
+        target = safe_join(self.root, req.path.lstrip('/') if as_is else export_file(req.path))
+        if target is None or not os.path.isfile(target):
+            return self.wsgi_app(environ, start_response)
+
+        encoding = None
+        for name, suffix in EXPORT_ENCODINGS.items():
+            if req.accept_encodings[name] and os.path.isfile(target + suffix):
+                encoding, target = name, target + suffix
+                break
+
+        with open(target, 'rb') as f:
+            body = f.read()
+        mimetype = mimetypes.guess_type(target[:-len(EXPORT_ENCODINGS[encoding])] if encoding else target)[0]
+        response = Response(body, mimetype=mimetype or 'application/octet-stream')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.add_etag()
+        response.last_modified = os.path.getmtime(target)
+        response.cache_control.public = True
+        if is_asset:
+            response.cache_control.max_age = 31536000
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(req)(environ, start_response)
+
+
+@app.cli.command('export')
+@click.argument('out_dir', default='out')
+def export_command(out_dir):
+    """Pre-render the portfolio into OUT_DIR with precompressed siblings."""
+    for target in export_site(out_dir):
+        click.echo(target)
+
+
+if os.environ.get('EXPORT_DIR'):
+    app.wsgi_app = ExportedSite(app.wsgi_app, os.environ['EXPORT_DIR'])
+
+# ---------------------------
+# Contact rate limiting
+# ---------------------------
+# Token buckets (one per client IP plus a global one) live in a small
+# memory-mapped file, so every gunicorn worker process sees the same counts.
+# The check runs as the outermost WSGI layer and answers 429 before Flask
+# parses the form or renders anything.
+import mmap
+import struct
+
+app.config.setdefault('RATE_LIMIT_PATH', os.environ.get(
+    'RATE_LIMIT_PATH', os.path.join(app.instance_path, 'ratelimit.bin')))
+app.config.setdefault('CONTACT_RATE_PER_IP', (5, 300.0))   # 5 messages per 5 minutes per IP
+app.config.setdefault('CONTACT_RATE_GLOBAL', (60, 60.0))   # 60 messages per minute overall
+app.config.setdefault('RATE_LIMIT_SLOTS', 4096)
+# Number of reverse proxies in front of the app whose X-Forwarded-For entries
+# are trusted (1 on Render). 0 uses the socket address.
+app.config.setdefault('PROXY_HOPS', int(os.environ.get('PROXY_HOPS', 0)))
+
+_SLOT = struct.Struct('<Qdd')  # key hash, tokens, last refill (unix time)
+
+
+class SharedTokenBuckets:
+    """Fixed-size table of token buckets in a shared mmap.
+
+    Slot 0 is the global bucket; clients hash into the other slots. A client
+    that lands on a slot owned by another key takes it over with a full
+    bucket, so the table never grows and the global cap bounds the damage.
+    """
+
+    def __init__(self, path, slots):
+        self.path = path
+        self.slots = slots
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _map(self):
+        # Opened per process: fcntl locks don't exclude threads of one
+        # process, hence the extra threading lock in take().
+        if self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            size = self.slots * _SLOT.size
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._fd, self._mm, self._pid = fd, mmap.mmap(fd, size), os.getpid()
+        return self._fd, self._mm
+
+    def _refill(self, mm, offset, key, capacity, period, now):
+        stored, tokens, updated = _SLOT.unpack_from(mm, offset)
+        if stored != key:
+            return capacity
+        return min(capacity, tokens + max(0.0, now - updated) * capacity / period)
+
+    def take(self, client, per_client, overall):
+        """Consume one token from the client's and the global bucket.
+
+        Returns 0 when allowed, otherwise seconds until a token is available.
+        """
+        key = int.from_bytes(hashlib.blake2b(client.encode(), digest_size=8).digest(), 'little') or 1
+        offset = (1 + key % (self.slots - 1)) * _SLOT.size
+        now = time.time()
+        with self._lock:
+            fd, mm = self._map()
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                mine = self._refill(mm, offset, key, *per_client, now)
+                shared = self._refill(mm, 0, 0, *overall, now)
+                if mine < 1 or shared < 1:
+                    wait = max((1 - mine) * per_client[1] / per_client[0],
+                               (1 - shared) * overall[1] / overall[0])
+                    return max(wait, 0.001)
+                _SLOT.pack_into(mm, offset, key, mine - 1, now)
+                _SLOT.pack_into(mm, 0, 0, shared - 1, now)
+                return 0
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+
+
+def client_ip(environ, proxy_hops):
+    if proxy_hops:
+        forwarded = [ip.strip() for ip in environ.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= proxy_hops:
+            return forwarded[-proxy_hops]
+    return environ.get('REMOTE_ADDR', '')
+
+
+class ContactRateLimit:
+    """WSGI middleware rejecting over-limit POST /contact with 429."""
+
+    def __init__(self, wsgi_app, buckets, config):
+        self.wsgi_app = wsgi_app
+        self.buckets = buckets
+        self.config = config
+
+    def __call__(self, environ, start_response):
+        if environ['REQUEST_METHOD'] == 'POST' and environ.get('PATH_INFO') == '/contact':
+            cfg = self.config
+            wait = self.buckets.take(client_ip(environ, cfg['PROXY_HOPS']),
+                                     cfg['CONTACT_RATE_PER_IP'], cfg['CONTACT_RATE_GLOBAL'])
+            if wait:
+                body = b'Too many messages, please try again later.'
+                start_response('429 Too Many Requests', [
+                    ('Content-Type', 'text/plain; charset=utf-8'),
+                    ('Content-Length', str(len(body))),
+                    ('Retry-After', str(int(wait) + 1)),
+                ])
+                return [body]
+        return self.wsgi_app(environ, start_response)
+
+
+RATE_LIMITS = SharedTokenBuckets(app.config['RATE_LIMIT_PATH'], app.config['RATE_LIMIT_SLOTS'])
+app.wsgi_app = ContactRateLimit(app.wsgi_app, RATE_LIMITS, app.config)
+
+# ---------------------------
+# Metrics
+# ---------------------------
+# Every response gets a Server-Timing header (app time, template render,
+# cache hit or miss) for the browser's devtools, and the same events feed
+# per-process counters and histograms. Those are written to one file per
+# worker in METRICS_DIR by a background thread at most every
+# METRICS_FLUSH_INTERVAL seconds; /metrics sums the files into Prometheus
+# text format, so a scrape sees every gunicorn worker whichever one answers.
+app.config.setdefault('METRICS_ENABLED', os.environ.get('METRICS_ENABLED', '1') != '0')
+app.config.setdefault('METRICS_DIR', os.environ.get('METRICS_DIR', os.path.join(app.instance_path, 'metrics')))
+app.config.setdefault('METRICS_FLUSH_INTERVAL', 5.0)
+app.config.setdefault('METRICS_TOKEN', os.environ.get('METRICS_TOKEN', ''))  # if set, /metrics wants it as a Bearer token
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+METRIC_TYPES = {
+    'portfolio_http_requests_total': ('counter', 'Responses by route, method and status.', None),
+    'portfolio_http_request_duration_seconds': ('histogram', 'Time spent in the Flask app.', LATENCY_BUCKETS),
+    'portfolio_http_response_size_bytes': ('histogram', 'Response body size before compression.', SIZE_BUCKETS),
+    'portfolio_template_render_seconds': ('histogram', 'Template render and compaction time.', LATENCY_BUCKETS),
+    'portfolio_cache_requests_total': ('counter', 'Cache lookups by cache, result and (with TENANTS_DIR) tenant.', None),
+}
+
+
+class Metrics:
+    """Counters and histograms of one process, keyed by (name, label pairs).
+
+    A histogram is stored as its per-bucket counts (the last one for +Inf)
+    followed by the sum of observations. Values recorded before a fork are
+    dropped in the child, so the preloaded master's warm-up isn't counted
+    once per worker.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.values = {}
+        self.dirty = False
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        with self._lock:
+            if self.pid != os.getpid():
+                self._reset()
+            self.values[key] = self.values.get(key, 0) + value
+            self.dirty = True
+
+    def observe(self, name, value, labels):
+        buckets = METRIC_TYPES[name][2]
+        index = bisect.bisect_left(buckets, value)
+        key = (name, labels)
+        with self._lock:
+            if self.pid != os.getpid():
+                self._reset()
+            histogram = self.values.get(key)
+            if histogram is None:
+                histogram = self.values[key] = [0] * (len(buckets) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += value
+            self.dirty = True
+
+    def flush(self):
+        """Write this process's values to METRICS_DIR/<pid>.json if they changed."""
+        with self._lock:
+            if not self.dirty or self.pid != os.getpid():
+                return
+            payload = json.dumps([[name, labels, value] for (name, labels), value in self.values.items()])
+            self.dirty = False
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{self.pid}.json')
+        with open(f'{path}.tmp', 'w') as f:
+            f.write(payload)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Sum the files of every process, live or exited, into one mapping."""
+        self.flush()
+        merged = {}
+        try:
+            entries = [entry.path for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        except FileNotFoundError:
+            entries = []
+        for path in entries:
+            try:
+                with open(path) as f:
+                    rows = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in rows:
+                if name not in METRIC_TYPES:
+                    continue
+                key = (name, tuple(tuple(pair) for pair in labels))
+                previous = merged.get(key)
+                if previous is None:
+                    merged[key] = value
+                elif isinstance(value, list):
+                    merged[key] = [a + b for a, b in zip(previous, value)]
+                else:
+                    merged[key] = previous + value
+        return merged
+
+
+def _label_value(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(pairs):
+    return '{' + ','.join(f'{k}="{_label_value(v)}"' for k, v in pairs) + '}' if pairs else ''
+
+
+def exposition(values):
+    """Render collected values in the Prometheus text format (version 0.0.4)."""
+    series = {}
+    for (name, labels), value in sorted(values.items()):
+        series.setdefault(name, []).append((labels, value))
+    lines = []
+    for name, rows in series.items():
+        kind, text, buckets = METRIC_TYPES[name]
+        lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}']
+        for labels, value in rows:
+            if kind != 'histogram':
+                lines.append(f'{name}{_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + (float('inf'),), value):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {value[-1]!r}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsFlusher(threading.Thread):
+    """Flushes METRICS every METRICS_FLUSH_INTERVAL seconds, off the request path."""
+
+    def __init__(self, metrics, interval):
+        super().__init__(name='metrics-flusher', daemon=True)
+        self.metrics = metrics
+        self.interval = interval
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.metrics.flush()
+            except OSError as exc:
+                app.logger.error('metrics flush failed: %s', exc)
+
+
+METRICS = Metrics(app.config['METRICS_DIR'])
+_metrics_flusher = {'pid': None}
+_metrics_flusher_lock = threading.Lock()
+
+
+def note_timing(name, seconds=None, desc=None):
+    """Add one Server-Timing entry to the current response."""
+    if has_request_context() and app.config['METRICS_ENABLED']:
+        entry = name
+        if seconds is not None:
+            entry += f';dur={seconds * 1000:.2f}'
+        if desc is not None:
+            entry += f';desc="{desc}"'
+        g.setdefault('server_timing', []).append(entry)
+
+
+def record_render(template_name, seconds):
+    if app.config['METRICS_ENABLED']:
+        METRICS.observe('portfolio_template_render_seconds', seconds, (('template', template_name),))
+        note_timing('render', seconds, template_name)
+
+
+def cache_tally(cache):
+    """[hits, misses] of one cache in this request, recorded by _record_request()."""
+    return g.setdefault('cache_lookups', {}).setdefault(cache, [0, 0])
+
+
+def record_cache(cache, hit):
+    if not app.config['METRICS_ENABLED']:
+        return
+    if has_request_context():
+        cache_tally(cache)[0 if hit else 1] += 1
+    else:
+        METRICS.inc('portfolio_cache_requests_total', (('cache', cache), ('result', 'hit' if hit else 'miss')))
+
+
+@app.before_request
+def _start_request_timer():
+    if app.config['METRICS_ENABLED']:
+        g.request_start = time.perf_counter()
+        if _metrics_flusher['pid'] != os.getpid():
+            with _metrics_flusher_lock:
+                if _metrics_flusher['pid'] != os.getpid():
+                    MetricsFlusher(METRICS, app.config['METRICS_FLUSH_INTERVAL']).start()
+                    _metrics_flusher['pid'] = os.getpid()
+
+
+@app.after_request
+def _record_request(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    METRICS.inc('portfolio_http_requests_total',
+                (('method', request.method), ('route', route), ('status', str(response.status_code))))
+    METRICS.observe('portfolio_http_request_duration_seconds', elapsed, (('route', route),))
+    if not response.is_streamed:
+        METRICS.observe('portfolio_http_response_size_bytes', response.content_length or 0, (('route', route),))
+    timings = [f'app;dur={elapsed * 1000:.2f}']
+    snapshot = g.get('content')
+    tenant = (('tenant', snapshot.tenant),) if TENANTS and snapshot else ()
+    for cache, (hits, misses) in g.get('cache_lookups', {}).items():
+        for result, count in (('hit', hits), ('miss', misses)):
+            if count:
+                METRICS.inc('portfolio_cache_requests_total', (('cache', cache), ('result', result)) + tenant, count)
+        desc = 'hit' if (hits, misses) == (1, 0) else 'miss' if (hits, misses) == (0, 1) else f'{hits} hit, {misses} miss'
+        timings.append(f'{cache}-cache;desc="{desc}"')
+    response.headers['Server-Timing'] = ', '.join(timings + g.get('server_timing', []))
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return app.response_class('unauthorized\n', status=401, mimetype='text/plain')
+    return app.response_class(exposition(METRICS.collect()),
+                              content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# ---------------------------
+# Page-view analytics
+# ---------------------------
+# Views per route and per project, external referrer hosts and accepted
+# contact messages, per tenant. The request path only bumps a key in this
+# worker's in-memory dict (no lock, no I/O); a background thread swaps the
+# dict out every ANALYTICS_FLUSH_INTERVAL seconds and adds it to
+# ANALYTICS_PATH with one batched upsert, so /stats sums every worker that
+# has flushed plus this one's unflushed counts. Under the GIL an increment
+# racing the swap can land in the dict being flushed or, rarely, be lost;
+# that is the price of keeping locks off the request path.
+import atexit
+from functools import lru_cache
+
+app.config.setdefault('ANALYTICS_ENABLED', os.environ.get('ANALYTICS_ENABLED', '1') != '0')
+app.config.setdefault('ANALYTICS_PATH', os.environ.get(
+    'ANALYTICS_PATH', os.path.join(app.instance_path, 'analytics.sqlite3')))
+app.config.setdefault('ANALYTICS_FLUSH_INTERVAL', 10.0)
+app.config.setdefault('ANALYTICS_MAX_KEYS', 10000)  # new keys per flush beyond this are dropped
+app.config.setdefault('ANALYTICS_TOKEN', os.environ.get('ANALYTICS_TOKEN', ''))  # if set, /stats wants it as a Bearer token
+
+VIEW_ENDPOINTS = frozenset({'index', 'projects', 'project', 'search'})
+
+_ANALYTICS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_stats (
+    tenant TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (tenant, kind, key)
+) WITHOUT ROWID;
+"""
+
+
+class PageViews:
+    """Per-process counters keyed by (tenant, kind, key), flushed to SQLite in batches.
+
+    kind is 'route' (URL rule), 'project' (id), 'referrer' (host) or
+    'contact' (key '').
+    """
+
+    def __init__(self, path, max_keys):
+        self.path = path
+        self.max_keys = max_keys
+        self.pending = {}
+        self._local = threading.local()
+
+    def connection(self):
+        # sqlite3 connections are per thread; each thread opens its own.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_ANALYTICS_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def count(self, key):
+        pending = self.pending
+        n = pending.get(key)
+        if n is None and len(pending) >= self.max_keys:
+            return  # bounds memory against junk referrers until the next flush
+        pending[key] = (n or 0) + 1
+
+    def flush(self):
+        """Upsert the counts gathered since the last flush; return how many keys."""
+        # Request threads that fetched the old dict just before the swap may
+        # still be adding to it; iterate a copy so they can't break the loop.
+        pending, self.pending = self.pending, {}
+        pending = pending.copy()
+        if not pending:
+            return 0
+        conn = self.connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT INTO page_stats (tenant, kind, key, count) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (tenant, kind, key) DO UPDATE SET count = count + excluded.count',
+                [(*key, n) for key, n in pending.items()])
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            for key, n in pending.items():  # keep them for the next attempt
+                self.pending[key] = self.pending.get(key, 0) + n
+            raise
+        return len(pending)
+
+    def totals(self, tenant):
+        """{kind: {key: count}} for one tenant: flushed rows plus this process's pending ones."""
+        totals = {}
+        rows = self.connection().execute(
+            'SELECT kind, key, count FROM page_stats WHERE tenant = ?', (tenant,)).fetchall()
+        rows += [(kind, key, n) for (t, kind, key), n in self.pending.copy().items() if t == tenant]
+        for kind, key, n in rows:
+            counts = totals.setdefault(kind, {})
+            counts[key] = counts.get(key, 0) + n
+        return totals
+
+
+class AnalyticsFlusher(threading.Thread):
+    """Flushes ANALYTICS every ANALYTICS_FLUSH_INTERVAL seconds, off the request path."""
+
+    def __init__(self, views, interval):
+        super().__init__(name='analytics-flusher', daemon=True)
+        self.views = views
+        self.interval = interval
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.views.flush()
+            except Exception:
+                app.logger.exception('analytics flush failed')
+
+
+ANALYTICS = PageViews(app.config['ANALYTICS_PATH'], app.config['ANALYTICS_MAX_KEYS'])
+_analytics_flusher = {'pid': None}
+_analytics_flusher_lock = threading.Lock()
+
+
+@atexit.register
+def _flush_analytics():
+    # gunicorn workers exit normally on restarts; keep their last counts.
+    if _analytics_flusher['pid'] == os.getpid():
+        try:
+            ANALYTICS.flush()
+        except sqlite3.Error:
+            pass
+
+
+@lru_cache(maxsize=1024)
+def referrer_host(referrer):
+    try:
+        return urlsplit(referrer).hostname
+    except ValueError:
+        return None
+
+
+@app.after_request
+def _count_page_view(response):
+    if not app.config['ANALYTICS_ENABLED']:
+        return response
+    # Each `request.x` goes through a context-local proxy (~1.5 us); resolve it once.
+    req = request._get_current_object()
+    endpoint = req.endpoint
+    if req.method == 'GET' and endpoint in VIEW_ENDPOINTS and response.status_code in (200, 304):
+        snapshot = g.get('content')
+        tenant = snapshot.tenant if snapshot else ''
+        ANALYTICS.count((tenant, 'route', req.url_rule.rule))
+        if endpoint == 'project':
+            ANALYTICS.count((tenant, 'project', req.view_args['pid']))
+        referrer = req.headers.get('Referer')
+        if referrer:
+            host = referrer_host(referrer)
+            if host and host != request_host(req):
+                ANALYTICS.count((tenant, 'referrer', host))
+    elif req.method == 'POST' and endpoint == 'contact' and response.status_code == 200:
+        snapshot = g.get('content')
+        ANALYTICS.count((snapshot.tenant if snapshot else '', 'contact', ''))
+    else:
+        return response
+    if _analytics_flusher['pid'] != os.getpid():
+        with _analytics_flusher_lock:
+            if _analytics_flusher['pid'] != os.getpid():
+                AnalyticsFlusher(ANALYTICS, app.config['ANALYTICS_FLUSH_INTERVAL']).start()
+                _analytics_flusher['pid'] = os.getpid()
+    return response
+
+
+@app.route('/stats')
+def stats():
+    token = app.config['ANALYTICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return api_error(401, 'unauthorized')
+    totals = ANALYTICS.totals(content().tenant)
+    routes = totals.get('route', {})
+    views = sum(routes.values())
+    contacts = totals.get('contact', {}).get('', 0)
+    body = {
+        'views': views,
+        'routes': routes,
+        'projects': dict(sorted(totals.get('project', {}).items(), key=lambda item: -item[1])),
+        'referrers': dict(sorted(totals.get('referrer', {}).items(), key=lambda item: -item[1])[:50]),
+        'contacts': contacts,
+        'conversion_rate': round(contacts / views, 4) if views else None,
+        'flush_interval': app.config['ANALYTICS_FLUSH_INTERVAL'],
+    }
+    response = app.response_class(dumps(body), mimetype='application/json')
+    response.cache_control.no_store = True
+    return response
+
+# ---------------------------
+# Warm-up
+# ---------------------------
+# gunicorn.conf.py calls warm_up() in the master after the app is preloaded
+# and before workers fork, so every worker starts with compiled templates,
+# built indexes and rendered, pre-compressed pages shared copy-on-write.
+
+def warm_paths():
+    """Every content-driven URL worth rendering ahead of the first request."""
+    data = content().data
+    pages = -(-len(data['projects']) // app.config['PROJECTS_PER_PAGE'])
+    return (export_paths()
+            + [f'/projects?page={n}' for n in range(1, pages + 1)]
+            + [f'/api/{collection}' for collection in API_COLLECTIONS]
+            + ['/sw.js', '/precache-manifest.json']
+            + [asset_url(name) for name in ASSETS])
+
+
+def warm_up():
+    """Fill the template, index, page and compression caches; return the URLs warmed.
+
+    Views are dispatched directly rather than through the WSGI stack so the
+    before_request hooks don't start the content watcher or delivery thread
+    in the process that is about to fork.
+    """
+    compile_templates()
+    with app.test_request_context('/'):
+        project_index(), search_index(), facet_index()
+        paths = warm_paths()
+    for path in paths:
+        with app.test_request_context(path):
+            response = app.make_response(app.dispatch_request())
+            if response.is_streamed or response.status_code != 200:
+                continue
+            body, etag = response.get_data(), response.headers.get('ETag')
+            if etag and len(body) >= app.config['COMPRESS_MIN_SIZE']:
+                for encoding in ENCODERS:
+                    COMPRESSION.compress(body, encoding, etag)
+    return paths
+
+# ---------------------------
+# Startup snapshot
+# ---------------------------
+# Render's filesystem is reset whenever a service spins back up, so caches a
+# running worker writes are gone by the next cold start. Instead the build
+# step runs `flask --app app prepare`, which warms up and saves the rendered
+# page, API and compression caches (and, as a side effect of compiling, the
+# template bytecode cache) next to the code. At import the snapshot is loaded
+# back if it was taken from the same content version; otherwise it is ignored
+# and pages render on demand as before.
+import marshal
+
+app.config.setdefault('STARTUP_SNAPSHOT', os.environ.get(
+    'STARTUP_SNAPSHOT', os.path.join(app.instance_path, 'startup-snapshot.bin')))  # '' disables
+SNAPSHOT_FORMAT = 2  # 2: cache keys start with the tenant
+SNAPSHOT_CACHES = {'pages': PAGE_CACHE, 'api': API_CACHE, 'compressed': COMPRESSION}
+
+
+def save_startup_snapshot(path):
+    """Warm up, then write the warmed caches to path; return the entry count.
+
+    marshal rather than pickle: the caches only hold str, bytes and tuples,
+    and loading a marshal file can't run code.
+    """
+    warm_up()
+    payload = {'format': SNAPSHOT_FORMAT, 'version': CONTENT.current.version}
+    for name, cache in SNAPSHOT_CACHES.items():
+        payload[name] = [(key, str(value) if isinstance(value, str) else value)
+                         for key, value in cache.items()]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        marshal.dump(payload, f)
+    os.replace(tmp, path)
+    return sum(len(payload[name]) for name in SNAPSHOT_CACHES)
+
+
+def load_startup_snapshot(path):
+    """Fill the caches from a snapshot of the current content; return the entry count."""
+    try:
+        with open(path, 'rb') as f:
+            payload = marshal.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, EOFError, ValueError, TypeError) as exc:
+        app.logger.warning('ignoring unreadable startup snapshot %s: %s', path, exc)
+        return 0
+    if (not isinstance(payload, dict) or payload.get('format') != SNAPSHOT_FORMAT
+            or payload.get('version') != CONTENT.current.version):
+        return 0
+    for name, cache in SNAPSHOT_CACHES.items():
+        cache.update(payload[name])
+    return sum(len(payload[name]) for name in SNAPSHOT_CACHES)
+
+
+@app.cli.command('prepare')
+def prepare_command():
+    """Write the template bytecode cache and startup snapshot (build step).
+
+    A flask command rather than an app.py flag: compiled templates name the
+    cache extension by module path, which must be `app` as under gunicorn.
+    """
+    if not app.config['STARTUP_SNAPSHOT']:
+        raise click.UsageError('STARTUP_SNAPSHOT is disabled')
+    entries = save_startup_snapshot(app.config['STARTUP_SNAPSHOT'])
+    click.echo(f"{app.config['STARTUP_SNAPSHOT']}: {entries} cached entries")
+
+
+if app.config['STARTUP_SNAPSHOT']:
+    _started = time.perf_counter()
+    STARTUP_TIMES['snapshot_entries'] = load_startup_snapshot(app.config['STARTUP_SNAPSHOT'])
+    STARTUP_TIMES['load_snapshot'] = time.perf_counter() - _started
 
 # ---------------------------
 # Static files note
@@ -781,7 +3853,18 @@ def contact():
 # For the images to show, create a folder named 'static' next to this file and add:
 # - profile.jpg (your photo)
 # - projects/compost.jpg, parking.jpg, hotel.jpg, trash.jpg, mq4.jpg
-# If you don't have images, point DATA['profile_image'] and project['image'] to external URLs.
+# If you don't have images, point profile_image and each project's image in content.json to external URLs.
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Run or export the portfolio.')
+    parser.add_argument('--export', metavar='DIR', help='pre-render the site into DIR and exit')
+    parser.add_argument('--serve-export', metavar='DIR', help='serve pages from an exported DIR')
+    args = parser.parse_args()
+    if args.export:
+        for target in export_site(args.export):
+            print(target)
+        sys.exit(0)
+    if args.serve_export:
+        app.wsgi_app = ExportedSite(app.wsgi_app, args.serve_export)
     app.run(debug=True)
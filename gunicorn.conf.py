@@ -0,0 +1,57 @@
+"""
+Production gunicorn settings (render.yaml runs `gunicorn -c gunicorn.conf.py app:app`).
+
+The app is preloaded and warmed in the master, then frozen out of the
+cyclic GC so forked workers keep sharing those pages instead of copying
+them when a collection touches their object headers.
+
+Environment:
+    WEB_CONCURRENCY        worker processes (default: from the usable CPUs, at most 8)
+    GUNICORN_WORKER_CLASS  sync (default) or gthread
+    GUNICORN_THREADS       threads per gthread worker (default 4)
+    GUNICORN_WARM_UP       set to 0 to skip the pre-fork warm-up
+"""
+import gc
+import os
+import shutil
+import time
+
+# CPUs this process may run on, not the host's: containers are usually
+# pinned to a few of a large machine's cores.
+cpus = len(os.sched_getaffinity(0))
+# Without WEB_CONCURRENCY, never start more workers than this; memory, not
+# CPU, is what runs out first on small instances.
+MAX_DEFAULT_WORKERS = 8
+
+preload_app = True
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+if worker_class == 'gthread':
+    # Threads share one process's caches; fewer, busier processes.
+    workers = int(os.environ.get('WEB_CONCURRENCY', min(cpus, MAX_DEFAULT_WORKERS)))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+else:
+    workers = int(os.environ.get('WEB_CONCURRENCY', min(cpus * 2 + 1, MAX_DEFAULT_WORKERS)))
+    threads = 1
+accesslog = '-'
+
+# Objects created while importing and warming are never collected anyway;
+# skipping collections until they are frozen keeps them from being moved
+# between generations, which would dirty their pages before the fork.
+gc.disable()
+
+
+def on_starting(server):
+    """Drop the previous run's per-worker metrics files; counters restart at zero."""
+    import app
+    shutil.rmtree(app.app.config['METRICS_DIR'], ignore_errors=True)
+
+
+def when_ready(server):
+    """Runs in the master once the app is loaded, before any worker forks."""
+    if os.environ.get('GUNICORN_WARM_UP', '1') != '0':
+        import app
+        start = time.perf_counter()
+        paths = app.warm_up()
+        server.log.info('Warmed %d URLs in %.0f ms', len(paths), (time.perf_counter() - start) * 1000)
+    gc.freeze()
+    gc.enable()
@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+# Keep the app's SQLite files, shared memory and caches out of instance/, and
+# don't let background link checks or startup snapshots leak into the tests.
+_state = tempfile.mkdtemp(prefix='portfolio-tests-')
+for name, value in {
+    'OUTBOX_PATH': os.path.join(_state, 'outbox.sqlite3'),
+    'RATE_LIMIT_PATH': os.path.join(_state, 'ratelimit.bin'),
+    'ANALYTICS_PATH': os.path.join(_state, 'analytics.sqlite3'),
+    'LINK_HEALTH_PATH': os.path.join(_state, 'link-health.json'),
+    'METRICS_DIR': os.path.join(_state, 'metrics'),
+    'JINJA_CACHE_DIR': '',
+    'STARTUP_SNAPSHOT': '',
+    'LINK_CHECK_INTERVAL': '0',
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
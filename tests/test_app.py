@@ -0,0 +1,479 @@
+import asyncio
+import fnmatch
+import gzip
+import io
+import json
+import re
+import shutil
+import sys
+from email import message_from_bytes
+
+import pytest
+from werkzeug.test import Client
+
+import app as portfolio
+import bench
+
+
+@pytest.fixture
+def client():
+    return portfolio.app.test_client()
+
+
+@pytest.fixture
+def data():
+    """An editable copy of the shipped content; install_content() it to serve it."""
+    shipped = portfolio.thaw(portfolio.CONTENT.current.data)
+    yield portfolio.thaw(shipped)
+    portfolio.install_content(shipped)
+
+
+# ---------------------------
+# Templates
+# ---------------------------
+
+def test_content_is_escaped_on_every_page(client, data):
+    data['name'] = '<i>Ada</i>'
+    data['projects'][0].update(name='<b>XSS</b>', summary='<script>x()</script>', stack=['<u>Rust</u>'])
+    portfolio.install_content(data)
+    for path in ('/', '/projects', f"/project/{data['projects'][0]['id']}"):
+        body = client.get(path).get_data(as_text=True)
+        for raw in ('<i>Ada</i>', '<b>XSS</b>', '<script>x()</script>', '<u>Rust</u>'):
+            assert raw not in body, f'{raw} reached {path} unescaped'
+    assert '&lt;b&gt;XSS&lt;/b&gt;' in client.get('/').get_data(as_text=True)
+
+
+# ---------------------------
+# Size budgets
+# ---------------------------
+
+def test_routes_fit_their_size_budgets(client):
+    checked = set()
+    for route, raw, _ in bench.route_sizes(client):
+        for pattern, budget in bench.SIZE_BUDGETS.items():
+            if fnmatch.fnmatchcase(route, pattern):
+                assert raw <= budget, f'{route} is {raw} bytes, budget {budget}'
+                checked.add(pattern)
+    assert checked == set(bench.SIZE_BUDGETS)
+
+
+# ---------------------------
+# Contact outbox
+# ---------------------------
+
+@pytest.fixture
+def smtp_config():
+    server = bench.start_stub_smtp(0)
+    config = dict(portfolio.app.config, SMTP_HOST='127.0.0.1', SMTP_PORT=server.server_address[1],
+                  SMTP_STARTTLS=False, CONTACT_TO='owner@example.com')
+    yield server, config
+    server.shutdown()
+    server.server_close()
+
+
+def test_outbox_delivers_through_smtp(tmp_path, smtp_config):
+    server, config = smtp_config
+    outbox = portfolio.Outbox(str(tmp_path / 'outbox.sqlite3'))
+    for i in range(3):
+        outbox.enqueue(f'Ada {i}', 'ada@example.com', 'Hello!')
+    worker = portfolio.DeliveryWorker(outbox, config)
+    worker.drain()
+    worker.smtp.close()
+    assert server.received == 3
+    assert outbox.counts() == {'sent': 3}
+
+
+def test_outbox_delivers_names_with_line_breaks(tmp_path, smtp_config):
+    server, config = smtp_config
+    outbox = portfolio.Outbox(str(tmp_path / 'outbox.sqlite3'))
+    outbox.enqueue('Ada\r\nBcc: victim@example.com', 'ada@example.com\r\n', 'Hello!')
+    outbox.enqueue('Grace', 'grace@example.com', 'Hi!')
+    worker = portfolio.DeliveryWorker(outbox, config)
+    worker.drain()
+    worker.smtp.close()
+    assert server.received == 2
+    assert outbox.counts() == {'sent': 2}
+
+
+def test_contact_email_headers_stay_on_one_line():
+    msg = portfolio.build_contact_email('Ada\r\nBcc: victim@example.com', 'ada@example.com\n',
+                                        'Hello!', dict(portfolio.app.config, CONTACT_TO='owner@example.com'))
+    parsed = message_from_bytes(msg.as_bytes())
+    assert parsed['Bcc'] is None
+    assert parsed['Subject'] == 'Portfolio contact from Ada Bcc: victim@example.com'
+    assert parsed['Reply-To'] == 'ada@example.com'
+
+
+# ---------------------------
+# Link checks
+# ---------------------------
+
+@pytest.fixture(scope='module')
+def link_outcomes():
+    server = bench.start_stub_http(0, slow=2.0)
+    port = server.server_address[1]
+    kinds = ('ok', 'gone', 'moved', 'nohead', 'error', 'slow')
+    checker = portfolio.LinkChecker(0.5, 8, 2, 5)
+    try:
+        outcomes = asyncio.run(checker.check_all([f'http://127.0.0.1:{port}/{kind}/1' for kind in kinds]))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {url.split('/')[3]: outcome for url, outcome in outcomes.items()}
+
+
+@pytest.mark.parametrize('kind, outcome, failed', [
+    ('ok', (200, None), False),
+    ('gone', (404, None), True),
+    ('moved', (200, None), False),
+    ('nohead', (200, None), False),
+    ('error', (500, None), True),
+    ('slow', (None, 'timeout'), False),
+])
+def test_link_classification(link_outcomes, kind, outcome, failed):
+    assert link_outcomes[kind] == outcome
+    assert portfolio.link_failed(*outcome) is failed
+
+
+def test_links_break_only_after_repeated_failures(tmp_path, link_outcomes):
+    health = portfolio.LinkHealth(str(tmp_path / 'links.json'), broken_after=2)
+    outcomes = {f'https://example.com/{kind}': outcome for kind, outcome in link_outcomes.items()}
+    health.record(outcomes, 1.0)
+    assert health.state[1] == frozenset()
+    health.record(outcomes, 2.0)
+    assert health.state[1] == {'https://example.com/gone', 'https://example.com/error'}
+
+
+def test_one_process_checks_links(tmp_path):
+    health = portfolio.LinkHealth(str(tmp_path / 'links.json'), broken_after=2)
+    leader = portfolio.LinkWatcher(health, list, portfolio.app.config)
+    assert leader.elected()
+    assert leader.elected()  # still held on the next round
+    # flock excludes other open files even within a process, so this stands in for another worker.
+    assert not portfolio.LinkWatcher(health, list, portfolio.app.config).elected()
+    leader._lock_file.close()
+    assert portfolio.LinkWatcher(health, list, portfolio.app.config).elected()
+
+
+# ---------------------------
+# Tenants
+# ---------------------------
+
+@pytest.fixture
+def tenants(tmp_path, data, monkeypatch):
+    """TENANTS over a directory holding example.org's content."""
+    data['name'] = 'Example Org Person'
+    (tmp_path / 'example.org.json').write_text(json.dumps(data))
+    registry = portfolio.TenantRegistry(str(tmp_path))
+    monkeypatch.setattr(portfolio, 'TENANTS', registry)
+    return registry
+
+
+def test_tenant_is_chosen_by_host(client, tenants):
+    assert 'Example Org Person' in client.get('/', headers={'Host': 'example.org'}).get_data(as_text=True)
+    assert 'Example Org Person' in client.get('/', headers={'Host': 'EXAMPLE.org:8000'}).get_data(as_text=True)
+    assert 'Example Org Person' not in client.get('/', headers={'Host': 'other.example'}).get_data(as_text=True)
+
+
+def test_unreadable_tenants_dir_keeps_the_last_listing(client, tenants, tmp_path):
+    client.get('/', headers={'Host': 'example.org'})
+    shutil.rmtree(tmp_path)
+    assert [store.tenant for store in tenants.refresh()] == ['example.org']
+    assert 'Example Org Person' in client.get('/', headers={'Host': 'example.org'}).get_data(as_text=True)
+
+
+# ---------------------------
+# Images
+# ---------------------------
+
+@pytest.fixture
+def static_images(tmp_path, monkeypatch):
+    Image = pytest.importorskip('PIL.Image')
+    static = tmp_path / 'static'
+    (static / 'projects').mkdir(parents=True)
+    Image.new('RGB', (800, 600), 'red').save(static / 'projects' / 'ok.jpg')
+    (static / 'projects' / 'junk.jpg').write_bytes(b'not an image')
+    full = io.BytesIO()
+    Image.effect_noise((800, 600), 64).convert('RGB').save(full, format='JPEG')
+    (static / 'projects' / 'cut.jpg').write_bytes(full.getvalue()[:len(full.getvalue()) // 2])
+    monkeypatch.setattr(portfolio.app, 'static_folder', str(static))
+    monkeypatch.setitem(portfolio.app.config, 'IMAGE_CACHE_DIR', str(tmp_path / 'cache'))
+    return static
+
+
+def test_image_variants(client, static_images):
+    src = portfolio.image_sources('/static/projects/ok.jpg')['src']
+    response = client.get(src)
+    assert response.status_code == 200 and response.mimetype == 'image/webp'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert client.get('/img/projects/ok.jpg?w=320&fmt=webp').status_code == 200
+
+
+@pytest.mark.parametrize('path', ['/img/projects', '/img/projects/', '/img/320/0123abcd/projects',
+                                  '/img/missing.jpg'])
+def test_image_not_found(client, static_images, path):
+    assert client.get(path).status_code == 404
+
+
+@pytest.mark.parametrize('name', ['junk.jpg', 'cut.jpg'])
+def test_unreadable_images_are_sent_as_is(client, static_images, name):
+    response = client.get(f'/img/projects/{name}?w=320')
+    assert response.status_code == 200
+    assert response.get_data() == (static_images / 'projects' / name).read_bytes()
+
+
+def test_decompression_bombs_are_not_decoded(client, static_images, monkeypatch):
+    monkeypatch.setattr(sys.modules['PIL.Image'], 'MAX_IMAGE_PIXELS', 1000)
+    response = client.get('/img/projects/ok.jpg?w=320')
+    assert response.status_code == 200
+    assert response.get_data() == (static_images / 'projects' / 'ok.jpg').read_bytes()
+
+
+# ---------------------------
+# Compression
+# ---------------------------
+
+@pytest.mark.parametrize('accept, encoding', [
+    ('gzip', 'gzip'),
+    ('br, gzip', 'gzip'),
+    ('br, gzip;q=0', None),
+    ('br, *;q=0.5', 'gzip'),
+    ('', None),
+])
+def test_streamed_pages_are_gzipped_only_when_accepted(client, monkeypatch, accept, encoding):
+    monkeypatch.setitem(portfolio.app.config, 'STREAM_PAGES', True)
+    monkeypatch.setitem(portfolio.ENCODERS, 'br', lambda body: body)  # negotiable even without brotli
+    response = client.get('/', headers={'Accept-Encoding': accept})
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == encoding
+    body = response.get_data()
+    assert (gzip.decompress(body) if encoding else body).rstrip().endswith(b'</html>')
+
+
+# ---------------------------
+# Stack facets
+# ---------------------------
+
+@pytest.fixture
+def stacks(data):
+    stacks = {'a': ['ESP8266', 'Firebase'], 'b': ['Flutter', 'Firebase'], 'c': ['Java']}
+    data['projects'] = [dict(data['projects'][0], id=pid, stack=stack) for pid, stack in stacks.items()]
+    portfolio.install_content(data)
+
+
+def listed(client, query):
+    response = client.get('/projects?' + query)
+    assert response.status_code == 200
+    return set(re.findall(r'href="/project/(\w+)"', response.get_data(as_text=True)))
+
+
+@pytest.mark.parametrize('query, projects', [
+    ('', {'a', 'b', 'c'}),
+    ('stack=firebase', {'a', 'b'}),
+    ('stack=Firebase&stack=ESP8266', {'a'}),
+    ('stack=Flutter&stack=ESP8266', set()),
+    ('stack=Flutter&stack=ESP8266&match=any', {'a', 'b'}),
+    ('stack=Java&stack=Flutter&match=any', {'b', 'c'}),
+])
+def test_facets_and_or(client, stacks, query, projects):
+    assert listed(client, query) == projects
+
+
+@pytest.mark.parametrize('query, projects', [
+    ('stack=Bogus', set()),
+    ('stack=Firebase&stack=Bogus', set()),
+    ('stack=Firebase&stack=Bogus&match=all', set()),
+    ('stack=Java&stack=Bogus&match=any', {'c'}),
+])
+def test_unknown_stack_names(client, stacks, query, projects):
+    cached = len(portfolio.PAGE_CACHE.items())
+    assert listed(client, query) == projects
+    if not projects:
+        assert len(portfolio.PAGE_CACHE.items()) == cached
+
+
+# ---------------------------
+# Static export
+# ---------------------------
+
+def test_export_serves_the_service_worker(tmp_path, client):
+    portfolio.export_site(str(tmp_path))
+    exported = Client(portfolio.ExportedSite(lambda environ, start_response: pytest.fail(environ['PATH_INFO']),
+                                             str(tmp_path)))
+    for path in ('/', '/sw.js', '/precache-manifest.json'):
+        response = exported.get(path)
+        assert response.status_code == 200
+        assert response.get_data() == client.get(path).get_data()
+        assert 'no-cache' in response.headers['Cache-Control']
+    assert "register('/sw.js')" in client.get(portfolio.asset_url('site.js')).get_data(as_text=True)
+
+
+# ---------------------------
+# Page cache
+# ---------------------------
+
+@pytest.mark.parametrize('path', ['/', '/project/smart_compost'])
+def test_pages_revalidate_with_304(client, data, path):
+    portfolio.install_content(data)
+    response = client.get(path)
+    etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+    assert not etag.startswith('W/')
+    for headers in ({'If-None-Match': etag}, {'If-None-Match': 'W/' + etag},
+                    {'If-None-Match': f'"other", {etag}'}, {'If-Modified-Since': last_modified}):
+        revalidated = client.get(path, headers=headers)
+        assert revalidated.status_code == 304, headers
+        assert revalidated.get_data() == b''
+    assert client.get(path, headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_content_change_invalidates_etags(client, data):
+    portfolio.install_content(data)
+    etag = client.get('/').headers['ETag']
+    data['title'] = 'Something new'
+    portfolio.install_content(data)
+    response = client.get('/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert 'Something new' in response.get_data(as_text=True)
+
+
+# ---------------------------
+# Contact rate limit
+# ---------------------------
+
+@pytest.fixture
+def rate_limits(tmp_path, monkeypatch):
+    """Fresh shared buckets for the test; the process's own are remapped afterwards."""
+    buckets = portfolio.RATE_LIMITS
+    path = buckets.path
+    buckets.path, buckets._pid = str(tmp_path / 'ratelimit.bin'), None
+    monkeypatch.setitem(portfolio.app.config, 'PROXY_HOPS', 0)
+    yield portfolio.app.config
+    buckets.path, buckets._pid = path, None
+
+
+def post_contact(client, ip, **headers):
+    return client.post('/contact', data={'name': 'Ada', 'email': 'ada@example.com', 'message': 'Hi'},
+                       headers=headers, environ_overrides={'REMOTE_ADDR': ip})
+
+
+def test_contact_is_limited_per_ip(client, rate_limits, monkeypatch):
+    monkeypatch.setitem(rate_limits, 'CONTACT_RATE_PER_IP', (2, 300.0))
+    monkeypatch.setitem(rate_limits, 'CONTACT_RATE_GLOBAL', bench.LIFTED_LIMIT)
+    assert [post_contact(client, '198.51.100.1').status_code for _ in range(3)] == [200, 200, 429]
+    rejected = post_contact(client, '198.51.100.1')
+    assert rejected.status_code == 429
+    assert 0 < int(rejected.headers['Retry-After']) <= 151
+    assert post_contact(client, '198.51.100.2').status_code == 200
+
+
+def test_contact_is_limited_globally(client, rate_limits, monkeypatch):
+    monkeypatch.setitem(rate_limits, 'CONTACT_RATE_PER_IP', bench.LIFTED_LIMIT)
+    monkeypatch.setitem(rate_limits, 'CONTACT_RATE_GLOBAL', (3, 60.0))
+    assert [post_contact(client, f'198.51.100.{i}').status_code for i in range(5)] == [200, 200, 200, 429, 429]
+
+
+def test_contact_limit_keys_on_the_forwarded_client(client, rate_limits, monkeypatch):
+    monkeypatch.setitem(rate_limits, 'PROXY_HOPS', 1)
+    monkeypatch.setitem(rate_limits, 'CONTACT_RATE_PER_IP', (1, 300.0))
+    monkeypatch.setitem(rate_limits, 'CONTACT_RATE_GLOBAL', bench.LIFTED_LIMIT)
+    proxy = '10.0.0.1'
+    assert post_contact(client, proxy, **{'X-Forwarded-For': '203.0.113.9'}).status_code == 200
+    assert post_contact(client, proxy, **{'X-Forwarded-For': '203.0.113.9'}).status_code == 429
+    # Only the hop our proxy appended counts; whatever the client sent before it is ignored.
+    assert post_contact(client, proxy, **{'X-Forwarded-For': '203.0.113.9, 203.0.113.10'}).status_code == 200
+
+
+# ---------------------------
+# Content store
+# ---------------------------
+
+def test_content_validation(data):
+    assert portfolio.validate_content(data)['projects'][0]['id'] == data['projects'][0]['id']
+    del data['projects'][0]['demo']
+    assert portfolio.validate_content(data)['projects'][0]['demo'] == ''  # optional, defaulted
+    del data['email']
+    with pytest.raises(portfolio.ContentError, match="missing required key 'email'"):
+        portfolio.validate_content(data)
+    data['email'] = 'ada@example.com'
+    data['projects'][1]['stack'] = 'Python'
+    with pytest.raises(portfolio.ContentError, match=r'content\.projects\[1\]\.stack: expected a list'):
+        portfolio.validate_content(data)
+
+
+def test_snapshots_are_read_only(data):
+    data['projects'].append(dict(data['projects'][0]))
+    with pytest.raises(portfolio.ContentError, match='duplicate project id'):
+        portfolio.ContentSnapshot(data, '<test>', 0.0)
+    del data['projects'][-1]
+    snapshot = portfolio.ContentSnapshot(data, '<test>', 0.0)
+    with pytest.raises(TypeError):
+        snapshot.data['name'] = 'Mallory'
+    with pytest.raises(AttributeError):
+        snapshot.data['projects'].append({})
+
+
+def test_content_reloads_and_keeps_the_last_good_version(tmp_path, data):
+    path = tmp_path / 'content.json'
+    path.write_text(json.dumps(data))
+    store = portfolio.ContentStore(str(path))
+    store.load()
+    first = store.current
+    store.reload_if_changed()
+    assert store.current is first  # unchanged file: no new snapshot
+
+    data['name'] = 'Ada Lovelace'
+    path.write_text(json.dumps(data))
+    store.reload_if_changed()
+    second = store.current
+    assert second.data['name'] == 'Ada Lovelace'
+    assert second.version != first.version and second.modified > first.modified
+
+    path.write_text('{"name": ')
+    with pytest.raises(portfolio.ContentError):
+        store.reload_if_changed()
+    assert store.current is second
+    store.reload_if_changed()  # reported once; retried on the next edit
+    assert store.current is second
+
+
+# ---------------------------
+# JSON API
+# ---------------------------
+
+@pytest.fixture
+def many_projects(data):
+    data['projects'] = [dict(data['projects'][0], id=f'p{i}', name=f'Project {i}') for i in range(5)]
+    portfolio.install_content(data)
+    return data
+
+
+def test_api_fields_and_pagination(client, many_projects):
+    first = client.get('/api/projects?per_page=2&fields=name, id').get_json()
+    assert first['items'] == [{'id': 'p0', 'name': 'Project 0'}, {'id': 'p1', 'name': 'Project 1'}]
+    assert (first['page'], first['per_page'], first['pages'], first['total']) == (1, 2, 3, 5)
+    pages = [first]
+    while pages[-1]['next']:
+        pages.append(client.get(pages[-1]['next']).get_json())
+    assert [item['id'] for page in pages for item in page['items']] == [f'p{i}' for i in range(5)]
+    assert all(set(item) == {'id', 'name'} for page in pages for item in page['items'])
+    assert client.get('/api/projects?page=4&per_page=2').status_code == 404
+
+
+def test_api_items(client, many_projects):
+    assert client.get('/api/projects/p3').get_json() == many_projects['projects'][3]
+    assert client.get('/api/projects/p3?fields=stack').get_json() == {'stack': many_projects['projects'][3]['stack']}
+    assert client.get('/api/experience').get_json()['items'] == many_projects['experience']
+    assert client.get('/api/projects/nope').status_code == 404
+    response = client.get('/api/projects?fields=id,password')
+    assert response.status_code == 400 and 'password' in response.get_json()['error']
+
+
+def test_api_etags(client, many_projects):
+    response = client.get('/api/certifications')
+    assert response.headers['Access-Control-Allow-Origin'] == '*'
+    etag = response.headers['ETag']
+    assert client.get('/api/certifications', headers={'If-None-Match': etag}).status_code == 304
+    many_projects['certifications'][0]['name'] = 'Renamed'
+    portfolio.install_content(many_projects)
+    assert client.get('/api/certifications', headers={'If-None-Match': etag}).status_code == 200